@@ -0,0 +1,272 @@
+"""
+Offline stand-ins used by the playback harness: a fake Discord voice client
+and interaction, a yt-dlp replacement serving canned info dicts, a local
+HTTP server for audio files and a synthetic Opus source.
+
+Import this module before anything from src/, since it installs the fake
+yt-dlp and sets the environment the bot's Config reads at import time.
+"""
+import os
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Optional, List, Dict, Callable
+
+HARNESS_CHANNEL_ID = 4242
+
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+os.environ.setdefault('ALLOWED_CHANNEL_IDS', str(HARNESS_CHANNEL_ID))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('METADATA_DB_PATH', '')
+
+# Opus packets are 20 ms; a silent-ish 128 kbps packet is ~320 bytes
+FRAME_SECONDS = 0.02
+SYNTHETIC_PACKET = b'\xfc' + b'\x00' * 319
+
+class FakeYoutubeDL:
+    """
+    yt-dlp replacement returning canned info dicts after a configurable delay.
+
+    Class attributes configure every instance: `latency` seconds are spent
+    per extract_info call (busy-waiting `cpu_fraction` of it, to mimic
+    yt-dlp's CPU-bound parsing), every track lasts `duration` seconds in
+    `acodec`, and `media_url` maps a video id to the stream URL handed to FFmpeg.
+    """
+    latency = 0.05
+    cpu_fraction = 0.3
+    duration = 5
+    acodec = 'opus'
+    media_url: Callable[[str], str] = staticmethod(lambda video_id: f'synthetic://{video_id}')
+    calls = 0
+
+    def __init__(self, params: Optional[Dict] = None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def _spend(self) -> None:
+        busy = self.latency * self.cpu_fraction
+        deadline = time.perf_counter() + busy
+        while time.perf_counter() < deadline:
+            pass
+        time.sleep(self.latency - busy)
+
+    def _info(self, video_id: str) -> Dict:
+        return {
+            'id': video_id,
+            'title': f'Benchmark Track {video_id}',
+            'webpage_url': f'https://www.youtube.com/watch?v={video_id}',
+            'duration': self.duration,
+            'url': self.media_url(video_id),
+            'acodec': self.acodec,
+            'abr': 128
+        }
+
+    def extract_info(self, url: str, download: bool = False, process: bool = True) -> Dict:
+        FakeYoutubeDL.calls += 1
+        self._spend()
+        if url.startswith('ytsearch:'):
+            query = url[len('ytsearch:'):]
+            video_id = f'{abs(hash(query)) % 10 ** 11:011d}'
+            return {'entries': [self._info(video_id)]}
+        video_id = url.rsplit('v=', 1)[-1][:11]
+        return self._info(video_id)
+
+def install_fake_ytdlp() -> None:
+    """Route every YoutubeDL construction in the bot to FakeYoutubeDL."""
+    try:
+        import yt_dlp
+    except ImportError:
+        yt_dlp = types.ModuleType('yt_dlp')
+        sys.modules['yt_dlp'] = yt_dlp
+    yt_dlp.YoutubeDL = FakeYoutubeDL
+
+class SyntheticSource:
+    """Opus source producing silent packets for a fixed duration (no FFmpeg)."""
+
+    def __init__(self, duration: float):
+        self.total_frames = int(duration / FRAME_SECONDS)
+        self.frames = 0
+        self.start_offset = 0.0
+        self.requested_at = None
+        self.previous_ended_at = None
+
+    @property
+    def position(self) -> float:
+        return self.start_offset + self.frames * FRAME_SECONDS
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        if self.frames >= self.total_frames:
+            return b''
+        self.frames += 1
+        return SYNTHETIC_PACKET
+
+    def cleanup(self) -> None:
+        pass
+
+@dataclass
+class VoiceStats:
+    """Timings recorded by one fake voice client."""
+    play_calls: List[float] = field(default_factory=list)
+    first_packets: List[float] = field(default_factory=list)
+    track_ends: List[float] = field(default_factory=list)
+    packets: int = 0
+
+class FakeVoiceClient:
+    """
+    Voice client that consumes sources like discord.py's audio thread.
+
+    Every play() starts a thread that reads one packet per 20 ms (divided by
+    `speed`), records when the first packet arrived, then calls the
+    after-callback and cleans the source up, in discord.py's order.
+    """
+
+    def __init__(self, channel: 'FakeVoiceChannel', speed: float = 1.0):
+        self.channel = channel
+        self.speed = speed
+        self.stats = VoiceStats()
+        self._connected = True
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def is_playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def play(self, source, *, after: Optional[Callable] = None) -> None:
+        self._stop = threading.Event()
+        self.stats.play_calls.append(time.perf_counter())
+        self._thread = threading.Thread(target=self._run, args=(source, after, self._stop), daemon=True)
+        self._thread.start()
+
+    def _run(self, source, after: Optional[Callable], stop: threading.Event) -> None:
+        interval = FRAME_SECONDS / self.speed
+        next_at = time.perf_counter()
+        first = True
+        error = None
+        try:
+            while not stop.is_set():
+                if self._paused.is_set():
+                    time.sleep(interval)
+                    continue
+                data = source.read()
+                if not data:
+                    break
+                if first:
+                    self.stats.first_packets.append(time.perf_counter())
+                    first = False
+                self.stats.packets += 1
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        except Exception as e:
+            error = e
+        finally:
+            self.stats.track_ends.append(time.perf_counter())
+            if after is not None:
+                after(error)
+            source.cleanup()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def pause(self) -> None:
+        self._paused.set()
+
+    def resume(self) -> None:
+        self._paused.clear()
+
+    async def move_to(self, channel: 'FakeVoiceChannel') -> None:
+        self.channel = channel
+
+    async def disconnect(self, *, force: bool = False) -> None:
+        self._stop.set()
+        self._connected = False
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.voice_client: Optional[FakeVoiceClient] = None
+
+class FakeVoiceChannel:
+    """Voice channel whose connect() hands out FakeVoiceClients."""
+
+    def __init__(self, guild: FakeGuild, speed: float = 1.0):
+        self.guild = guild
+        self.speed = speed
+
+    async def connect(self) -> FakeVoiceClient:
+        voice_client = FakeVoiceClient(self, self.speed)
+        self.guild.voice_client = voice_client
+        return voice_client
+
+class _FakeResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+
+    async def defer(self, *args, **kwargs) -> None:
+        pass
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        self._interaction.messages.append(content)
+
+class _FakeFollowup:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        self._interaction.messages.append(content)
+
+class FakeInteraction:
+    """The parts of discord.Interaction the command cogs use."""
+
+    def __init__(self, guild_id: int, user_id: int, channel: FakeVoiceChannel):
+        self.guild_id = guild_id
+        self.channel_id = HARNESS_CHANNEL_ID
+        self.user = types.SimpleNamespace(id=user_id, voice=types.SimpleNamespace(channel=channel))
+        self.response = _FakeResponse(self)
+        self.followup = _FakeFollowup(self)
+        self.messages: List[Optional[str]] = []
+
+class AudioFileServer:
+    """Serves a directory of audio files over HTTP, like googlevideo serves streams."""
+
+    def __init__(self, directory: str):
+        handler = partial(_QuietHandler, directory=directory)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> 'AudioFileServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end playback benchmark.
+
+Drives the real /play and queue cogs, AudioManager and AudioPlayer against
+simulated guilds: voice connections are fake (packets are consumed at the
+20 ms Opus frame rate), yt-dlp is replaced by canned info dicts with a
+configurable extraction latency, and streams are local audio files served
+over HTTP to real FFmpeg processes. Hosts without FFmpeg can use
+--source synthetic, which replaces FFmpeg with silent in-process packets
+(latency and gap figures stay meaningful, CPU per stream then only covers
+the bot process).
+
+Measured per guild count:
+    /play latency       command start to first audio packet (p50/p90/p99)
+    inter-track gap     end of one track to the first packet of the next
+    queue-op rate       /move, /remove and /queue commands per second
+    CPU per stream      bot + FFmpeg CPU time per second of audio delivered
+
+Results are written as JSON for regression comparison.
+
+Usage:
+    python benchmarks/playback_harness.py [--guilds 1,10,100,1000] [--source auto|ffmpeg|synthetic]
+    python benchmarks/playback_harness.py --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Every simulated guild may stream at once; raise the FFmpeg cap unless the caller set one
+os.environ.setdefault('FFMPEG_MAX_PROCESSES', '1000')
+
+from fakes import (
+    FakeYoutubeDL, FakeGuild, FakeVoiceChannel, FakeInteraction, AudioFileServer,
+    SyntheticSource, FRAME_SECONDS, install_fake_ytdlp
+)
+
+install_fake_ytdlp()
+
+from src.commands.play import PlayCommand
+from src.commands.queue import QueueCommands
+from src.services.audio_player import audio_manager, PlayerState
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor
+from src.services.playback import playback_engine, PATH_PASSTHROUGH
+from src.services.track import Track
+from src.services.youtube_service import youtube_service
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# metric -> True when higher is better
+METRICS = {
+    'play_latency_p50': False,
+    'play_latency_p90': False,
+    'play_latency_p99': False,
+    'track_gap_p50': False,
+    'track_gap_p99': False,
+    'queue_ops_per_second': True,
+    'cpu_ms_per_stream_second': False,
+}
+# Metrics in seconds, where changes below --min-delta are timer noise
+SECONDS_METRICS = {'play_latency_p50', 'play_latency_p90', 'play_latency_p99', 'track_gap_p50', 'track_gap_p99'}
+
+# yt-dlp codec name and FFmpeg encoder for each generated file
+CODECS = {
+    'opus': ('opus', 'libopus', 'webm'),
+    'aac': ('mp4a.40.2', 'aac', 'm4a'),
+}
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def cpu_seconds() -> float:
+    """CPU time of this process plus its reaped children (FFmpeg)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def generate_audio(directory: str, codec: str, seconds: float) -> str:
+    """Encode a sine tone with FFmpeg and return its file name."""
+    _, encoder, extension = CODECS[codec]
+    name = f'track.{extension}'
+    subprocess.run(
+        ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+         '-c:a', encoder, '-b:a', '128k', os.path.join(directory, name)],
+        check=True
+    )
+    return name
+
+def use_synthetic_sources() -> None:
+    """Replace FFmpeg sources with in-process silent packets."""
+    async def create_source(stream, preset=None, start_offset=0.0):
+        source = SyntheticSource(FakeYoutubeDL.duration - start_offset)
+        source.start_offset = start_offset
+        return source, PATH_PASSTHROUGH, 128
+    playback_engine.create_source = create_source
+
+class Scenario:
+    """One benchmark run at a fixed number of simulated guilds."""
+
+    def __init__(self, run_id: str, guilds: int, tracks: int, queue_length: int,
+                 queue_rounds: int, speed: float):
+        self.run_id = run_id
+        self.tracks = tracks
+        self.queue_length = queue_length
+        self.queue_rounds = queue_rounds
+        self.speed = speed
+        self.play_cog = PlayCommand(None)
+        self.queue_cog = QueueCommands(None)
+        self.guilds = [FakeGuild(100_000 + index) for index in range(guilds)]
+        self.channels = {guild.id: FakeVoiceChannel(guild, speed) for guild in self.guilds}
+
+    def interaction(self, guild: FakeGuild) -> FakeInteraction:
+        return FakeInteraction(guild.id, guild.id, self.channels[guild.id])
+
+    async def _play_guild(self, guild: FakeGuild) -> float:
+        """Issue /play for every track of one guild; returns when the first /play started."""
+        started = time.perf_counter()
+        for number in range(self.tracks):
+            query = f'benchmark {self.run_id} guild {guild.id} track {number}'
+            await self.play_cog.play.callback(self.play_cog, self.interaction(guild), query)
+        return started
+
+    async def _wait_for_playback(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            done = all(
+                guild.voice_client is not None
+                and len(guild.voice_client.stats.track_ends) >= self.tracks
+                and audio_manager.peek_player(guild.id).state is PlayerState.IDLE
+                for guild in self.guilds
+            )
+            if done:
+                return
+            await asyncio.sleep(0.1)
+        raise TimeoutError(f"Playback did not finish within {timeout:.0f}s")
+
+    async def measure_playback(self) -> Dict:
+        """Run /play in every guild at once and time the audio that comes out."""
+        cpu_start = cpu_seconds()
+        wall_start = time.perf_counter()
+        starts = await asyncio.gather(*(self._play_guild(guild) for guild in self.guilds))
+        timeout = 60 + self.tracks * FakeYoutubeDL.duration / self.speed * 4
+        await self._wait_for_playback(timeout)
+        wall = time.perf_counter() - wall_start
+
+        # Let every FFmpeg process exit and be reaped, so its CPU time is counted
+        await asyncio.sleep(0.5)
+        cpu = cpu_seconds() - cpu_start
+
+        latencies, gaps = [], []
+        packets = 0
+        for guild, started in zip(self.guilds, starts):
+            stats = guild.voice_client.stats
+            packets += stats.packets
+            if stats.first_packets:
+                latencies.append(stats.first_packets[0] - started)
+            gaps.extend(
+                first - ended
+                for ended, first in zip(stats.track_ends, stats.first_packets[1:])
+            )
+
+        audio_seconds = packets * FRAME_SECONDS
+        return {
+            'play_latency_p50': percentile(latencies, 50),
+            'play_latency_p90': percentile(latencies, 90),
+            'play_latency_p99': percentile(latencies, 99),
+            'track_gap_p50': percentile(gaps, 50),
+            'track_gap_p99': percentile(gaps, 99),
+            'tracks_played': sum(len(g.voice_client.stats.first_packets) for g in self.guilds),
+            'audio_seconds': round(audio_seconds, 2),
+            'wall_seconds': round(wall, 2),
+            'cpu_seconds': round(cpu, 3),
+            'cpu_ms_per_stream_second': cpu * 1000 / audio_seconds if audio_seconds else None,
+        }
+
+    async def _queue_ops_guild(self, guild: FakeGuild) -> int:
+        player = audio_manager.get_player(guild.id)
+        for number in range(self.queue_length):
+            await player.enqueue(Track(f'Queued {number}', f'q{guild.id % 10 ** 6:06d}{number:05d}'))
+
+        ops = 0
+        for _ in range(self.queue_rounds):
+            await self.queue_cog.move.callback(self.queue_cog, self.interaction(guild), 1, self.queue_length)
+            await self.queue_cog.remove.callback(self.queue_cog, self.interaction(guild), self.queue_length)
+            await player.enqueue(Track('Requeued', f'r{guild.id % 10 ** 6:06d}'))
+            await self.queue_cog.queue.callback(self.queue_cog, self.interaction(guild))
+            ops += 4
+        return ops
+
+    async def measure_queue_ops(self) -> Dict:
+        """Run queue commands in every guild at once."""
+        start = time.perf_counter()
+        ops = sum(await asyncio.gather(*(self._queue_ops_guild(guild) for guild in self.guilds)))
+        elapsed = time.perf_counter() - start
+        return {'queue_ops': ops, 'queue_ops_per_second': ops / elapsed}
+
+    async def teardown(self) -> None:
+        for guild_id in list(audio_manager.players):
+            await audio_manager.remove_player(guild_id)
+
+async def run(args: argparse.Namespace, source: str) -> Dict[str, Dict]:
+    """Run every scenario and return the results by guild count."""
+    if source == 'synthetic':
+        use_synthetic_sources()
+    else:
+        ffmpeg_supervisor.start()
+
+    results = {}
+    try:
+        for guilds in args.guilds:
+            print(f"Running {guilds} guild(s)...", flush=True)
+            scenario = Scenario(
+                f'{int(time.time())}-{guilds}', guilds, args.tracks,
+                args.queue_length, args.queue_rounds, args.speed
+            )
+            FakeYoutubeDL.calls = 0
+            try:
+                result = await scenario.measure_playback()
+                await scenario.teardown()
+                result.update(await scenario.measure_queue_ops())
+            finally:
+                await scenario.teardown()
+            result['extractions'] = FakeYoutubeDL.calls
+            results[str(guilds)] = result
+    finally:
+        if source != 'synthetic':
+            await ffmpeg_supervisor.stop()
+    return results
+
+def format_value(value: Optional[float]) -> str:
+    if value is None:
+        return '-'
+    return f'{value:.4f}' if value < 100 else f'{value:.0f}'
+
+def print_results(results: Dict[str, Dict]) -> None:
+    header = ['guilds'] + list(METRICS)
+    print('  '.join(f'{name:>24}' if i else f'{name:>6}' for i, name in enumerate(header)))
+    for guilds, result in results.items():
+        row = [f'{guilds:>6}'] + [f'{format_value(result.get(name)):>24}' for name in METRICS]
+        print('  '.join(row))
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float,
+            min_delta: float) -> List[str]:
+    """
+    Compare results with a baseline run.
+
+    Args:
+        results: Results by guild count
+        baseline: Baseline results by guild count
+        threshold: Relative change (0.1 = 10%) in the bad direction that counts as a regression
+        min_delta: Smallest absolute change in seconds that counts for latency and gap metrics
+
+    Returns:
+        Descriptions of the regressions found
+    """
+    regressions = []
+    print(f"\n{'guilds':>6}  {'metric':<26}{'baseline':>12}{'current':>12}{'change':>10}")
+    for guilds, result in results.items():
+        previous = baseline.get(guilds)
+        if previous is None:
+            continue
+        for name, higher_is_better in METRICS.items():
+            old, new = previous.get(name), result.get(name)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            noise = name in SECONDS_METRICS and abs(new - old) < min_delta
+            flag = '  REGRESSION' if worse > threshold and not noise else ''
+            print(f"{guilds:>6}  {name:<26}{format_value(old):>12}{format_value(new):>12}{change:>+10.1%}{flag}")
+            if flag:
+                regressions.append(f"{name} at {guilds} guild(s): {format_value(old)} -> {format_value(new)}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--guilds', type=lambda s: [int(n) for n in s.split(',')], default=[1, 10, 100, 1000],
+                        help='Comma separated guild counts (default 1,10,100,1000)')
+    parser.add_argument('--tracks', type=int, default=3, help='Tracks played per guild')
+    parser.add_argument('--track-seconds', type=float, default=5, help='Length of every track')
+    parser.add_argument('--speed', type=float, default=1.0, help='Playback speed multiplier for the fake voice clients')
+    parser.add_argument('--extract-latency', type=float, default=0.05, help='Seconds per fake yt-dlp extraction')
+    parser.add_argument('--queue-length', type=int, default=20, help='Tracks queued per guild for the queue-op test')
+    parser.add_argument('--queue-rounds', type=int, default=25, help='Queue command rounds per guild')
+    parser.add_argument('--source', choices=['auto', 'ffmpeg', 'synthetic'], default='auto',
+                        help='Audio sources: FFmpeg on local files, or synthetic packets (auto: FFmpeg if installed)')
+    parser.add_argument('--codec', choices=list(CODECS), default='opus',
+                        help='Codec of the local files (opus takes the passthrough path, aac is transcoded)')
+    parser.add_argument('--output', help='Result file (default benchmarks/results/playback-<time>.json)')
+    parser.add_argument('--compare', help='Baseline result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported as a regression')
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help='Latency and gap changes below this many seconds are never regressions')
+    args = parser.parse_args()
+
+    source = args.source
+    if source == 'auto':
+        source = 'ffmpeg' if shutil.which('ffmpeg') else 'synthetic'
+    FakeYoutubeDL.latency = args.extract_latency
+    FakeYoutubeDL.duration = args.track_seconds
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        codec = CODECS[args.codec][0] if source == 'ffmpeg' else 'opus'
+        FakeYoutubeDL.acodec = codec
+        if source == 'ffmpeg':
+            name = generate_audio(media_dir, args.codec, args.track_seconds)
+        with AudioFileServer(media_dir) as server:
+            if source == 'ffmpeg':
+                FakeYoutubeDL.media_url = staticmethod(lambda video_id: f'{server.base_url}/{name}?v={video_id}')
+            try:
+                results = asyncio.run(run(args, source))
+            finally:
+                youtube_service.shutdown()
+
+    print()
+    print_results(results)
+
+    document = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'source': source,
+            'codec': codec,
+            'tracks': args.tracks,
+            'track_seconds': args.track_seconds,
+            'speed': args.speed,
+            'extract_latency': args.extract_latency,
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"playback-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('source') != source:
+            print(f"Warning: baseline used {baseline['meta'].get('source')} sources, this run used {source}")
+        regressions = compare(results, baseline['results'], args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
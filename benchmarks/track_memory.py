@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark comparing bytes per queued track before and after the
+slotted Track record.
+
+Usage: python benchmarks/track_memory.py [--tracks N] [--requesters N]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.services.track import Track
+
+@dataclass
+class LegacyTrack:
+    """Track as it was stored before: regular dataclass with the full URL."""
+    title: str
+    url: str
+    duration: Optional[int] = None
+    requester_id: Optional[int] = None
+
+def make_entries(count: int, requesters: int):
+    """Build yt-dlp style entries, each with its own id and title."""
+    return [
+        {
+            'id': f"{i:011d}",
+            'title': f"Artist {i % 500} - Song {i} (Official Audio)",
+            'duration': 180 + i % 120,
+            # A fresh int per interaction, like the ids discord.py hands out
+            'requester': int(str(10 ** 17 + i % requesters))
+        }
+        for i in range(count)
+    ]
+
+# Both builders copy every string from the entry, since ids and titles
+# arrive as new strings from every extraction
+
+def build_legacy(entries):
+    return [
+        LegacyTrack(
+            title=''.join(entry['title']),
+            url=f"https://www.youtube.com/watch?v={entry['id']}",
+            duration=entry['duration'],
+            requester_id=entry['requester']
+        )
+        for entry in entries
+    ]
+
+def build_compact(entries):
+    return [
+        Track(
+            title=''.join(entry['title']),
+            video_id=''.join(entry['id']),
+            duration=entry['duration'],
+            requester_id=entry['requester']
+        )
+        for entry in entries
+    ]
+
+def measure(builder, entries) -> float:
+    """Bytes allocated per track by a builder."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracks = builder(entries)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del tracks
+    return allocated / len(entries)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=100_000)
+    parser.add_argument('--requesters', type=int, default=200)
+    args = parser.parse_args()
+
+    entries = make_entries(args.tracks, args.requesters)
+    legacy = measure(build_legacy, entries)
+    compact = measure(build_compact, entries)
+
+    print(f"Tracks: {args.tracks:,} ({args.requesters} requesters)")
+    print(f"Legacy dataclass:  {legacy:8.1f} bytes/track")
+    print(f"Slotted Track:     {compact:8.1f} bytes/track")
+    print(f"Saved:             {legacy - compact:8.1f} bytes/track ({(1 - compact / legacy) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-call YoutubeDL setup cost: a fresh instance per call
+(as search_video/get_audio_url used to do) versus the pooled instances.
+
+No network access is needed; only instance setup and teardown are timed.
+
+Usage: python benchmarks/ytdl_pool.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+
+import yt_dlp
+
+from src.services.youtube_service import YouTubeService, YoutubeDLPool
+
+def per_call(ydl_opts, calls: int) -> float:
+    """Seconds per call when building a YoutubeDL for every call."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            pass
+    return (time.perf_counter() - start) / calls
+
+def pooled(ydl_opts, calls: int) -> float:
+    """Seconds per call when borrowing from the pool."""
+    pool = YoutubeDLPool(max_uses=calls + 1)
+    start = time.perf_counter()
+    for _ in range(calls):
+        with pool.acquire(ydl_opts) as ydl:
+            pass
+    return (time.perf_counter() - start) / calls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    ydl_opts = YouTubeService().ydl_opts
+    fresh = per_call(ydl_opts, args.calls)
+    reused = pooled(ydl_opts, args.calls)
+
+    print(f"Calls: {args.calls}")
+    print(f"New YoutubeDL per call: {fresh * 1e3:8.3f} ms/call")
+    print(f"Pooled YoutubeDL:       {reused * 1e3:8.3f} ms/call")
+    print(f"Setup cost removed:     {(fresh - reused) * 1e3:8.3f} ms/call")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,11 @@
 """
 Main entry point for Groove Deck Discord music bot.
 """
+import time
+
+# Taken before any other import, for the startup timing breakdown
+STARTED_AT = time.perf_counter()
+
 import asyncio
 import sys
 import os
@@ -10,7 +15,15 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-from src.bot import main
+from src.config import Config
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if Config.SHARD_PROCESSES > 1 and not Config.SHARD_IDS:
+        # Supervise one worker process per shard range; workers re-enter here with SHARD_IDS set
+        from src.sharding import supervise
+        from src.logger import setup_logging
+        setup_logging()
+        asyncio.run(supervise())
+    else:
+        from src.bot import main
+        asyncio.run(main(STARTED_AT))
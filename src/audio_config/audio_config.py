@@ -9,7 +9,7 @@ class AudioConfig:
     # High Quality Preset (Best audio, higher bandwidth)
     HIGH_QUALITY = {
         'ffmpeg_options': '-vn -b:a 160k -ar 48000 -ac 2 -f opus',
-        'yt_dlp_format': 'bestaudio[ext=m4a]/bestaudio/best',
+        'yt_dlp_format': 'bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best',
         'audio_format': 'm4a',
         'bitrate': '160k',
         'sample_rate': '48000'
@@ -18,7 +18,7 @@ class AudioConfig:
     # Balanced Quality Preset (Good audio, moderate bandwidth)
     BALANCED_QUALITY = {
         'ffmpeg_options': '-vn -b:a 128k -ar 48000 -ac 2 -f opus',
-        'yt_dlp_format': 'bestaudio[ext=m4a]/bestaudio/best',
+        'yt_dlp_format': 'bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best',
         'audio_format': 'm4a',
         'bitrate': '128k',
         'sample_rate': '48000'
@@ -27,7 +27,7 @@ class AudioConfig:
     # Low Bandwidth Preset (Lower quality, minimal bandwidth)
     LOW_BANDWIDTH = {
         'ffmpeg_options': '-vn -b:a 96k -ar 48000 -ac 2 -f opus',
-        'yt_dlp_format': 'bestaudio/best',
+        'yt_dlp_format': 'bestaudio[acodec=opus][abr<=96]/bestaudio[acodec=opus]/bestaudio/best',
         'audio_format': 'mp3',
         'bitrate': '96k',
         'sample_rate': '48000'
@@ -36,7 +36,7 @@ class AudioConfig:
     # Discord Optimized Preset (Optimized for Discord's limitations)
     DISCORD_OPTIMIZED = {
         'ffmpeg_options': '-vn -b:a 128k -ar 48000 -ac 2 -f opus -af "volume=1.0,highpass=f=200,lowpass=f=3000"',
-        'yt_dlp_format': 'bestaudio[ext=m4a]/bestaudio/best',
+        'yt_dlp_format': 'bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best',
         'audio_format': 'm4a',
         'bitrate': '128k',
         'sample_rate': '48000'
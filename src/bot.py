@@ -2,19 +2,117 @@
 Main bot entry point for Groove Deck Discord music bot.
 """
 import discord
+from discord import app_commands
 from discord.ext import commands
 import asyncio
+import hashlib
+import json
 import logging
+import signal
 import sys
 import os
+import time
+from typing import Optional, List, Dict
 
 from src.config import Config
-from src.logger import logger
+from src.logger import logger, set_log_context
+from src.services.youtube_service import youtube_service
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor
+from src.services.audio_player import audio_manager
+from src.services.audio_cache import audio_cache
+from src.services.session_journal import session_journal, session_journal_path
+from src.services.metrics import registry
 
-class GrooveDeckBot(commands.Bot):
-    """Main bot class for Groove Deck."""
+class GrooveDeckTree(app_commands.CommandTree):
+    """Command tree that tags everything logged while handling a command with its guild."""
     
-    def __init__(self):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs inside the task that invokes the command, so the context covers the whole command
+        set_log_context(interaction.guild_id)
+        return True
+
+def command_tree_hash(tree: app_commands.CommandTree) -> str:
+    """Hash of the global command definitions, as they would be sent on sync."""
+    payload = []
+    for command in tree.get_commands():
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            # discord.py < 2.4 takes no tree argument
+            payload.append(command.to_dict())
+    encoded = json.dumps(sorted(payload, key=lambda c: (c.get('type', 1), c['name'])), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+async def sync_command_tree(tree: app_commands.CommandTree, application_id: Optional[int]) -> None:
+    """
+    Sync the global slash commands if they changed since the last sync.
+    
+    The global sync endpoint is heavily rate limited and a sync is only
+    needed when a command's name, options or description changes, so the
+    synced definitions are hashed and the hash is kept across restarts.
+    
+    Args:
+        tree: Command tree to sync
+        application_id: Bot application id, part of the hash so apps don't share it
+    """
+    digest = f"{application_id}:{command_tree_hash(tree)}"
+    path = Config.COMMAND_HASH_PATH
+    if path:
+        try:
+            with open(path) as f:
+                if f.read().strip() == digest:
+                    logger.info("Slash commands unchanged since the last sync, skipping it")
+                    return
+        except OSError:
+            pass
+
+    try:
+        synced = await tree.sync()
+        logger.info("Synced %s slash command(s)", len(synced))
+    except Exception as e:
+        logger.error("Failed to sync slash commands: %s", e)
+        return
+
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(digest + '\n')
+        except OSError as e:
+            logger.warning("Could not save the slash command hash: %s", e)
+
+class StartupTimer:
+    """Time spent in each startup phase, logged once the bot is first ready."""
+    
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self._last = self.started_at
+        self.phases: Dict[str, float] = {}
+        
+    def mark(self, phase: str) -> None:
+        """Close the current phase under the given name."""
+        now = time.perf_counter()
+        self.phases[phase] = round(now - self._last, 4)
+        self._last = now
+        
+    @property
+    def total(self) -> float:
+        return self._last - self.started_at
+        
+    def summary(self) -> str:
+        return ', '.join(f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items())
+
+class GrooveDeckBot(commands.AutoShardedBot):
+    """
+    Main bot class for Groove Deck.
+    
+    Runs every shard in one process by default. Under the sharding supervisor
+    each worker process gets its own shard_ids, so guild state (players,
+    queues, voice clients) stays local to the process owning the guild.
+    """
+    
+    def __init__(self, shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None,
+                 startup: Optional[StartupTimer] = None):
         # Set up intents - only use necessary non-privileged intents
         intents = discord.Intents.default()
         # Note: message_content and voice_states are privileged intents
@@ -26,12 +124,66 @@ class GrooveDeckBot(commands.Bot):
         super().__init__(
             command_prefix=Config.BOT_PREFIX,
             intents=intents,
-            help_command=None  # Disable default help command
+            help_command=None,  # Disable default help command
+            tree_cls=GrooveDeckTree,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
+        # Cleared after the first on_ready; later ones are reconnects
+        self.startup: Optional[StartupTimer] = startup or StartupTimer()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._restore_task: Optional[asyncio.Task] = None
+        
+    @property
+    def owns_first_shard(self) -> bool:
+        """Whether this process runs shard 0 (and so handles global work like command sync)."""
+        return not self.shard_ids or 0 in self.shard_ids
         
     async def setup_hook(self):
         """Set up the bot when it starts up."""
         logger.info("Setting up Groove Deck bot...")
+        self.startup.mark('login')
+        
+        # Open the persistent metadata store; rows are read lazily on lookup
+        if Config.METADATA_DB_PATH:
+            try:
+                youtube_service.open_store(Config.METADATA_DB_PATH)
+            except Exception as e:
+                logger.error("Failed to open metadata store: %s", e)
+                
+        # Serve popular tracks from local Opus files
+        if Config.AUDIO_CACHE_DIR:
+            try:
+                audio_cache.open(Config.AUDIO_CACHE_DIR)
+            except OSError as e:
+                logger.error("Failed to open audio cache: %s", e)
+                
+        # Load the sessions saved before the last shutdown; they are resumed in on_ready
+        if Config.SESSION_JOURNAL_PATH:
+            try:
+                session_journal.open(session_journal_path(Config.SESSION_JOURNAL_PATH, Config.WORKER_INDEX))
+            except OSError as e:
+                logger.error("Failed to open session journal: %s", e)
+        self.startup.mark('stores')
+                
+        # Move yt-dlp extraction out of the gateway process
+        if Config.EXTRACTION_PROCESSES > 0:
+            youtube_service.start_process_pool(Config.EXTRACTION_PROCESSES)
+            
+        # Reap exited FFmpeg children and sample their CPU/memory in the background
+        ffmpeg_supervisor.start()
+        
+        # Disconnect idle guilds and drop their players
+        audio_manager.start_reaper()
+        
+        # Expose metrics to a local scraper
+        if Config.METRICS_PORT:
+            try:
+                # Each shard worker listens on its own port
+                await registry.start_server(Config.METRICS_HOST, Config.METRICS_PORT + Config.WORKER_INDEX)
+            except OSError as e:
+                logger.error("Failed to start metrics endpoint: %s", e)
+        self.startup.mark('services')
         
         # Load command cogs
         try:
@@ -41,27 +193,65 @@ class GrooveDeckBot(commands.Bot):
             await self.load_extension("src.commands.audio")
             logger.info("Successfully loaded all command cogs")
         except Exception as e:
-            logger.error(f"Failed to load command cogs: {e}")
+            logger.error("Failed to load command cogs: %s", e)
             raise
+        self.startup.mark('cogs')
             
+    async def close(self):
+        """Flush persistent state before shutting down."""
+        # Snapshot the sessions while the players and voice clients still exist
+        await session_journal.close(audio_manager)
+        youtube_service.close_store()
+        youtube_service.shutdown()
+        await registry.stop_server()
+        await audio_manager.stop_reaper()
+        await audio_cache.close()
+        await ffmpeg_supervisor.stop()
+        await super().close()
+        
     async def on_ready(self):
         """Called when the bot is ready."""
-        logger.info(f"Logged in as {self.user.name} (ID: {self.user.id})")
-        logger.info(f"Bot is ready and serving {len(self.guilds)} guilds")
+        logger.info("Logged in as %s (ID: %s)", self.user.name, self.user.id)
+        logger.info("Bot is ready and serving %s guilds on shard(s) %s of %s",
+                    len(self.guilds), self.shard_ids or 'all', self.shard_count)
+        
+        # Everything below runs once per process, not on every reconnect
+        startup, self.startup = self.startup, None
+        if startup is None:
+            return
+        startup.mark('gateway')
+        logger.info("Started in %.3fs (%s)", startup.total, startup.summary(),
+                    extra={'startup': startup.phases})
         
-        # Sync slash commands
+        # Pay for the yt-dlp import now rather than in the first /play
+        youtube_service.warm_up()
+        
+        # Rejoin voice and resume the queues that were playing before the restart
+        if session_journal.enabled:
+            self._restore_task = asyncio.create_task(self.resume_sessions())
+            
+        # Commands are global, so only the worker running shard 0 syncs them
+        if self.owns_first_shard:
+            self._sync_task = asyncio.create_task(self.sync_commands())
+            
+    async def resume_sessions(self) -> None:
+        """Restore the journaled sessions, then start journaling the live ones."""
         try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} slash command(s)")
+            await session_journal.restore(audio_manager, self)
         except Exception as e:
-            logger.error(f"Failed to sync slash commands: {e}")
+            logger.error("Failed to restore sessions: %s", e)
+        session_journal.start(audio_manager)
+        
+    async def sync_commands(self) -> None:
+        """Sync the global slash commands if they changed since the last sync."""
+        await sync_command_tree(self.tree, self.application_id)
             
     async def on_command_error(self, ctx, error):
         """Handle command errors."""
         if isinstance(error, commands.CommandNotFound):
             return  # Ignore command not found errors
             
-        logger.error(f"Command error in {ctx.command}: {error}")
+        logger.error("Command error in %s: %s", ctx.command, error)
         
         # Send user-friendly error message
         if isinstance(error, commands.MissingPermissions):
@@ -71,17 +261,35 @@ class GrooveDeckBot(commands.Bot):
         else:
             await ctx.send("❌ An error occurred while processing your command.")
 
-async def main():
-    """Main function to run the bot."""
+async def main(started_at: Optional[float] = None):
+    """
+    Main function to run the bot.
+    
+    Args:
+        started_at: perf_counter() value from process start, for the startup timing log
+    """
+    startup = StartupTimer(started_at)
+    startup.mark('imports')
     try:
         # Validate configuration
         if not Config.validate():
             logger.error("Invalid configuration. Please check your environment variables.")
             return
             
-        # Create and run bot
-        bot = GrooveDeckBot()
+        # Create and run bot; shard settings come from the sharding supervisor when it launched us
+        bot = GrooveDeckBot(
+            shard_ids=Config.SHARD_IDS or None,
+            shard_count=Config.SHARD_COUNT or None,
+            startup=startup
+        )
         
+        # Shut down cleanly (flushing the metadata store) when the supervisor stops us
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+        except (NotImplementedError, RuntimeError):
+            pass
+            
         # Run the bot
         async with bot:
             await bot.start(Config.DISCORD_TOKEN)
@@ -89,7 +297,7 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
 
 if __name__ == "__main__":
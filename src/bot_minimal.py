@@ -14,6 +14,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import Config
 from src.logger import logger
+from src.services.audio_player import audio_manager
+from src.bot import sync_command_tree
 
 class GrooveDeckBotMinimal(commands.Bot):
     """Main bot class for Groove Deck without privileged intents."""
@@ -30,39 +32,48 @@ class GrooveDeckBotMinimal(commands.Bot):
             intents=intents,
             help_command=None  # Disable default help command
         )
+        # Set after the first on_ready; later ones are reconnects
+        self._ready_once = False
         
     async def setup_hook(self):
         """Set up the bot when it starts up."""
         logger.info("Setting up Groove Deck bot (minimal intents)...")
         
+        # Disconnect idle guilds and drop their players
+        audio_manager.start_reaper()
+        
         # Load command cogs
         try:
             await self.load_extension("src.commands.play")
             await self.load_extension("src.commands.queue")
             logger.info("Successfully loaded all command cogs")
         except Exception as e:
-            logger.error(f"Failed to load command cogs: {e}")
+            logger.error("Failed to load command cogs: %s", e)
             raise
             
+    async def close(self):
+        """Stop background services before shutting down."""
+        await audio_manager.stop_reaper()
+        await super().close()
+        
     async def on_ready(self):
         """Called when the bot is ready."""
-        logger.info(f"Logged in as {self.user.name} (ID: {self.user.id})")
-        logger.info(f"Bot is ready and serving {len(self.guilds)} guilds")
+        logger.info("Logged in as %s (ID: %s)", self.user.name, self.user.id)
+        logger.info("Bot is ready and serving %s guilds", len(self.guilds))
         logger.info("Note: Running with minimal intents - some features may be limited")
         
-        # Sync slash commands
-        try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} slash command(s)")
-        except Exception as e:
-            logger.error(f"Failed to sync slash commands: {e}")
+        if self._ready_once:
+            return
+        self._ready_once = True
+        # Sync slash commands, skipped while they match the last synced hash
+        await sync_command_tree(self.tree, self.application_id)
             
     async def on_command_error(self, ctx, error):
         """Handle command errors."""
         if isinstance(error, commands.CommandNotFound):
             return  # Ignore command not found errors
             
-        logger.error(f"Command error in {ctx.command}: {error}")
+        logger.error("Command error in %s: %s", ctx.command, error)
         
         # Send user-friendly error message
         if isinstance(error, commands.MissingPermissions):
@@ -90,7 +101,7 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
 
 if __name__ == "__main__":
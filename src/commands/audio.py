@@ -5,8 +5,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+from typing import Optional
 
 from src.config import Config
+from src.audio_config.audio_config import AudioConfig
+from src.services.audio_player import audio_manager
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,11 @@ class AudioCommands(commands.Cog):
             )
             return
             
+        # Read-only: inspect the guild without allocating a player
+        player = audio_manager.peek_player(interaction.guild_id)
+        preset_name = audio_manager.preset_name_for(interaction.guild_id)
+        preset = AudioConfig.get_preset('low' if audio_manager.low_bandwidth else preset_name)
+        
         # Create embed showing current settings
         embed = discord.Embed(
             title="🎵 Audio Configuration",
@@ -38,34 +47,58 @@ class AudioCommands(commands.Cog):
         # Current settings
         embed.add_field(
             name="⚙️ Current Settings",
-            value="**Format:** MP3\n"
-                  "**Sample Rate:** 48kHz\n"
-                  "**Channels:** Stereo (2)\n"
-                  "**Codec:** s16le (Discord compatible)",
+            value=f"**Preset:** {preset_name}\n"
+                  f"**Bitrate:** {preset['bitrate']}\n"
+                  f"**Sample Rate:** {int(preset['sample_rate']) // 1000}kHz\n"
+                  f"**Codec:** Opus",
             inline=True
         )
         
-        # Available presets
+        # Current stream
+        stream_path = player.stream_path if player and player.is_playing and player.stream_path else "idle"
+        process = ffmpeg_supervisor.get_process_stats(player.source) if player and player.source else None
+        ffmpeg_usage = "not running"
+        if process and process['rss_bytes'] is None:
+            ffmpeg_usage = "not sampled yet"
+        elif process:
+            ffmpeg_usage = f"{process['cpu_percent'] or 0:.1f}% CPU, {process['rss_bytes'] // (1024 * 1024)} MB"
         embed.add_field(
-            name="🎚️ Audio Quality",
-            value="**Current:** Discord Optimized\n"
-                  "**Format:** MP3 (128k)\n"
-                  "**Compatibility:** High",
+            name="📡 Current Stream",
+            value=f"**Path:** {stream_path}\n"
+                  f"**Low Bandwidth Mode:** {'On' if audio_manager.low_bandwidth else 'Off'}\n"
+                  f"**FFmpeg:** {ffmpeg_usage} "
+                  f"({ffmpeg_supervisor.process_count} running on the bot)",
             inline=True
         )
         
+        # Available presets
+        embed.add_field(
+            name="🎚️ Available Presets",
+            value="\n".join(
+                f"**{name}** - {description}"
+                for name, description in AudioConfig.list_presets().items()
+            ),
+            inline=False
+        )
+        
         embed.add_field(
             name="💡 Note",
-            value="Audio is optimized for Discord voice channels.\n"
-                  "Using MP3 format for maximum compatibility.",
+            value="Use `/audio_quality` to change the preset for this server.\n"
+                  "Changes apply from the next track.",
             inline=False
         )
         
         await interaction.response.send_message(embed=embed)
         
-    @app_commands.command(name="audio_quality", description="Show current audio quality information")
-    async def audio_quality(self, interaction: discord.Interaction):
-        """Show current audio quality information."""
+    @app_commands.command(name="audio_quality", description="Show or change the audio quality preset")
+    @app_commands.describe(quality="Preset to use for this server")
+    @app_commands.choices(quality=[
+        app_commands.Choice(name=description.split(' - ')[0], value=name)
+        for name, description in AudioConfig.list_presets().items()
+    ])
+    async def audio_quality(self, interaction: discord.Interaction,
+                            quality: Optional[app_commands.Choice[str]] = None):
+        """Show current audio quality information, optionally switching preset."""
         
         # Check if channel is whitelisted
         if interaction.channel_id not in Config.ALLOWED_CHANNEL_IDS:
@@ -75,37 +108,49 @@ class AudioCommands(commands.Cog):
             )
             return
             
+        if quality is not None:
+            player = audio_manager.get_player(interaction.guild_id)
+            if not player.set_preset(quality.value):
+                await interaction.response.send_message("❌ Unknown audio preset.")
+                return
+                
+        preset_name = audio_manager.preset_name_for(interaction.guild_id)
+        effective_preset_name = 'low' if audio_manager.low_bandwidth else preset_name
+        preset = AudioConfig.get_preset(effective_preset_name)
+        
         # Create confirmation embed
         embed = discord.Embed(
             title="🎵 Audio Quality Info",
-            description="Current audio configuration",
+            description=(
+                f"Preset set to **{preset_name}**" if quality is not None
+                else "Current audio configuration"
+            ),
             color=discord.Color.green()
         )
         
         embed.add_field(
             name="Current Settings",
-            value="**Format:** MP3\n"
-                  "**Bitrate:** 128k\n"
-                  "**Sample Rate:** 48kHz\n"
+            value=f"**Preset:** {effective_preset_name}\n"
+                  f"**Bitrate:** {preset['bitrate']}\n"
+                  f"**Sample Rate:** {int(preset['sample_rate']) // 1000}kHz\n"
                   "**Channels:** Stereo",
             inline=True
         )
         
         embed.add_field(
-            name="Discord Compatibility",
-            value="**Status:** ✅ Optimized\n"
-                  "**Format:** ✅ Compatible\n"
-                  "**Quality:** ✅ High",
+            name="Source Format",
+            value=f"`{preset['yt_dlp_format']}`",
             inline=True
         )
         
-        embed.add_field(
-            name="Note",
-            value="Audio is configured for maximum Discord compatibility.\n"
-                  "This should eliminate static/white noise issues.",
-            inline=False
-        )
-        
+        if audio_manager.low_bandwidth:
+            embed.add_field(
+                name="Note",
+                value="The bot is under heavy load, so the low bandwidth preset is\n"
+                      "used until outbound bandwidth drops again.",
+                inline=False
+            )
+            
         await interaction.response.send_message(embed=embed)
 
 async def setup(bot: commands.Bot):
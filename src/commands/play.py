@@ -4,12 +4,13 @@ Play command for adding music to the queue and starting playback.
 import discord
 from discord import app_commands
 from discord.ext import commands
-import asyncio
 import logging
+import time
 from typing import Optional
 
 from src.services.audio_player import audio_manager, Track
 from src.services.youtube_service import youtube_service
+from src.services.metrics import PLAY_LATENCY
 from src.config import Config
 
 logger = logging.getLogger(__name__)
@@ -41,11 +42,18 @@ class PlayCommand(commands.Cog):
             )
             return
             
+        requested_at = time.monotonic()
         await interaction.response.defer()
         
         try:
+            # Playlist links are enumerated and queued incrementally
+            if youtube_service.is_playlist_url(query):
+                await self._play_playlist(interaction, query, requested_at)
+                return
+                
             # Search for the video
-            video_info = youtube_service.search_video(query)
+            video_info = await youtube_service.search(query)
+            PLAY_LATENCY.observe(time.monotonic() - requested_at, stage='search')
             
             if not video_info:
                 await interaction.followup.send(
@@ -54,126 +62,64 @@ class PlayCommand(commands.Cog):
                 return
                 
             # Create track object
-            track = Track(
-                title=video_info['title'],
-                url=video_info['url'],
-                duration=video_info.get('duration'),
-                requester_id=interaction.user.id
-            )
+            track = Track.from_info(video_info, requester_id=interaction.user.id)
             
-            # Get or create audio player for this guild
+            # Get or create audio player for this guild and join the caller's channel
             player = audio_manager.get_player(interaction.guild_id)
+            await player.connect(interaction.user.voice.channel)
             
-            # Add track to queue
-            player.add_track(track)
+            duplicate = player.queue.contains(track)
+            await player.enqueue(track)
             
-            # If not currently playing, start playback
+            # If not currently playing, start playback; otherwise the track just waits its turn
             if not player.is_playing:
-                await self._start_playback(interaction, player, track)
-            else:
-                await interaction.followup.send(
-                    f"🎵 Added **{track.title}** to the queue!"
-                )
-                
-        except Exception as e:
-            logger.error(f"Error in play command: {e}")
-            await interaction.followup.send(
-                "❌ An error occurred while processing your request."
-            )
-            
-    async def _start_playback(self, interaction: discord.Interaction, player: 'AudioPlayer', track: Track):
-        """Start playback of a track."""
-        try:
-            voice_channel = interaction.user.voice.channel
-            
-            # Connect to voice channel
-            voice_client = await voice_channel.connect()
-            player.voice_client = voice_client
-            player.current_track = track
-            player.is_playing = True
-            
-            # Get audio URL and start playing
-            audio_url = youtube_service.get_audio_url(track.url)
-            
-            if audio_url:
-                # Create audio source with Discord-compatible settings
-                # Using simpler FFmpeg options to avoid audio corruption
-                audio_source = discord.FFmpegPCMAudio(
-                    audio_url,
-                    options='-vn -f s16le -ar 48000 -ac 2'
-                )
-                
-                # Play audio
-                voice_client.play(audio_source)
-                
+                if not await player.play(requested_at=requested_at):
+                    await interaction.followup.send(
+                        "❌ Could not extract audio from the video."
+                    )
+                    return
+                    
+            if player.current_track is track:
                 await interaction.followup.send(
                     f"🎵 Now playing: **{track.title}**"
                 )
-                
-                # Set up callback for when audio finishes
-                def on_finish(error):
-                    if error:
-                        logger.error(f"Audio playback error: {error}")
-                    
-                    # Play next track in queue
-                    asyncio.create_task(self._play_next(interaction.guild_id))
-                
-                voice_client.source = audio_source
-                voice_client.source.callback = on_finish
-                
             else:
                 await interaction.followup.send(
-                    "❌ Could not extract audio from the video."
+                    f"🎵 Added **{track.title}** to the queue!"
+                    + (" (it was already queued)" if duplicate else "")
                 )
-                player.stop_playback()
                 
         except Exception as e:
-            logger.error(f"Error starting playback: {e}")
+            logger.error("Error in play command: %s", e)
             await interaction.followup.send(
-                "❌ Failed to start playback. Please try again."
+                "❌ An error occurred while processing your request."
             )
-            player.stop_playback()
             
-    async def _play_next(self, guild_id: int):
-        """Play the next track in the queue."""
-        player = audio_manager.get_player(guild_id)
+    async def _play_playlist(self, interaction: discord.Interaction, playlist_url: str,
+                             requested_at: float):
+        """Queue a playlist as its entries stream in, starting playback with the first one."""
+        player = audio_manager.get_player(interaction.guild_id)
+        await player.connect(interaction.user.voice.channel)
+        queued = 0
         
-        if player.queue:
-            next_track = player.queue.pop(0)
-            player.current_track = next_track
-            
-            # Get audio URL and start playing
-            audio_url = youtube_service.get_audio_url(next_track.url)
+        # Tracks are built a batch at a time as pages of entries arrive. Stream
+        # URLs are not resolved here; each track is resolved (or prefetched)
+        # only once it reaches the head of the queue
+        async for entries in youtube_service.stream_playlist(playlist_url):
+            tracks = Track.from_entries(entries, requester_id=interaction.user.id)
+            for track in tracks:
+                await player.enqueue(track)
+            queued += len(tracks)
             
-            if audio_url and player.voice_client:
-                audio_source = discord.FFmpegPCMAudio(
-                    audio_url,
-                    options='-vn -f s16le -ar 48000 -ac 2'
-                )
-                
-                player.voice_client.play(audio_source)
+            if (tracks and not player.is_playing and await player.play(requested_at=requested_at)
+                    and player.current_track is tracks[0]):
+                await interaction.followup.send(f"🎵 Now playing: **{tracks[0].title}**")
                 
-                # Set up callback for when audio finishes
-                def on_finish(error):
-                    if error:
-                        logger.error(f"Audio playback error: {error}")
-                    
-                    # Play next track in queue
-                    asyncio.create_task(self._play_next(guild_id))
-                
-                player.voice_client.source = audio_source
-                player.voice_client.source.callback = on_finish
-                
-        else:
-            # No more tracks in queue
-            player.is_playing = False
-            player.current_track = None
+        if not queued:
+            await interaction.followup.send("❌ Could not load any tracks from that playlist.")
+            return
             
-            # Disconnect after a delay
-            if player.voice_client:
-                await asyncio.sleep(10)  # Wait 10 seconds
-                if player.voice_client and not player.is_playing:
-                    await player.voice_client.disconnect()
+        await interaction.followup.send(f"📜 Queued **{queued}** tracks from the playlist.")
 
 async def setup(bot: commands.Bot):
     """Set up the play command cog."""
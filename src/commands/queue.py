@@ -5,13 +5,146 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
-from typing import Optional
+from typing import Optional, Dict, Tuple
+from weakref import WeakKeyDictionary
 
-from src.services.audio_player import audio_manager
+from src.services.audio_player import audio_manager, AudioPlayer
+from src.services.track_queue import TrackQueue
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Tracks listed per /queue page; a full page stays under the 1024 character field limit
+QUEUE_PAGE_SIZE = 10
+MAX_TITLE_LENGTH = 70
+# Seconds the page buttons keep working after /queue
+QUEUE_VIEW_TIMEOUT = 180
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS, or M:SS under an hour."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def page_count(queue: TrackQueue) -> int:
+    """Number of /queue pages (at least one, for the now playing page)."""
+    return max(1, -(-len(queue) // QUEUE_PAGE_SIZE))
+
+class QueuePageCache:
+    """
+    Rendered 'Up Next' pages, kept until the queue's version changes.
+
+    Only the requested page is ever formatted, so showing a page does not
+    format the rest of the queue. Fetching the page's tracks still grows
+    with the page's distance from the nearer end of a very long queue (see
+    TrackQueue.page). Entries go away with their queue.
+    """
+    
+    def __init__(self):
+        # queue -> (version the pages were rendered at, page number -> text)
+        self._pages: 'WeakKeyDictionary[TrackQueue, Tuple[int, Dict[int, str]]]' = WeakKeyDictionary()
+        
+    def get(self, queue: TrackQueue, page: int) -> str:
+        """Get the text of a page, rendering it if the queue changed since it was cached."""
+        version, pages = self._pages.get(queue, (None, None))
+        if version != queue.version:
+            pages = {}
+            self._pages[queue] = (queue.version, pages)
+        text = pages.get(page)
+        if text is None:
+            text = pages[page] = self._render(queue, page)
+        return text
+        
+    @staticmethod
+    def _render(queue: TrackQueue, page: int) -> str:
+        start = page * QUEUE_PAGE_SIZE
+        lines = []
+        for position, track in enumerate(queue.page(start, QUEUE_PAGE_SIZE), start + 1):
+            title = track.title if len(track.title) <= MAX_TITLE_LENGTH else track.title[:MAX_TITLE_LENGTH - 1] + '…'
+            length = f" `{format_duration(track.duration)}`" if track.duration else ""
+            lines.append(f"**{position}.** {title}{length}")
+        return "\n".join(lines)
+
+# Global page cache shared by every /queue view
+queue_pages = QueuePageCache()
+
+def build_queue_embed(player: AudioPlayer, page: int) -> discord.Embed:
+    """
+    Build the /queue embed for one page.
+    
+    Args:
+        player: Guild audio player
+        page: 0-based page number (clamped to the last page)
+        
+    Returns:
+        Embed with the current track, the page of upcoming tracks and the remaining time
+    """
+    queue = player.queue
+    pages = page_count(queue)
+    page = min(max(page, 0), pages - 1)
+    embed = discord.Embed(
+        title="🎵 Music Queue",
+        color=discord.Color.blue()
+    )
+    
+    remaining = queue.total_duration
+    current = player.current_track
+    if current:
+        embed.add_field(
+            name="🎶 Now Playing",
+            value=f"**{current.title}**",
+            inline=False
+        )
+        if current.duration:
+            remaining += max(0, current.duration - player.position)
+            
+    if queue:
+        embed.add_field(
+            name=f"📋 Up Next ({len(queue)} tracks)",
+            value=queue_pages.get(queue, page),
+            inline=False
+        )
+        
+    footer = f"Page {page + 1}/{pages} • {format_duration(remaining)} remaining"
+    if queue.unknown_durations:
+        footer += f" (+{queue.unknown_durations} tracks of unknown length)"
+    embed.set_footer(text=footer)
+    return embed
+
+class QueueView(discord.ui.View):
+    """Previous/next buttons for a /queue message; each click renders only the new page."""
+    
+    def __init__(self, guild_id: int, page: int = 0):
+        super().__init__(timeout=QUEUE_VIEW_TIMEOUT)
+        self.guild_id = guild_id
+        self.page = page
+        self.previous_page.disabled = True
+        
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page - 1)
+        
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+        
+    async def _show(self, interaction: discord.Interaction, page: int) -> None:
+        # Look the player up again: it may have been evicted since /queue
+        player = audio_manager.peek_player(self.guild_id)
+        if not player or (not player.current_track and not player.queue):
+            self.stop()
+            await interaction.response.edit_message(
+                content="🎵 No music is currently playing or queued.", embed=None, view=None
+            )
+            return
+            
+        # The queue may have shrunk since the last click
+        pages = page_count(player.queue)
+        self.page = min(max(page, 0), pages - 1)
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+        await interaction.response.edit_message(embed=build_queue_embed(player, self.page), view=self)
+
 class QueueCommands(commands.Cog):
     """Handles queue management commands."""
     
@@ -30,41 +163,18 @@ class QueueCommands(commands.Cog):
             )
             return
             
-        player = audio_manager.get_player(interaction.guild_id)
-        queue_info = player.get_queue_info()
+        player = audio_manager.peek_player(interaction.guild_id)
         
-        if not queue_info['current_track'] and not queue_info['queue']:
+        if not player or (not player.current_track and not player.queue):
             await interaction.response.send_message("🎵 No music is currently playing or queued.")
             return
             
-        # Create embed for queue display
-        embed = discord.Embed(
-            title="🎵 Music Queue",
-            color=discord.Color.blue()
-        )
-        
-        # Current track
-        if queue_info['current_track']:
-            current = queue_info['current_track']
-            embed.add_field(
-                name="🎶 Now Playing",
-                value=f"**{current.title}**",
-                inline=False
-            )
-            
-        # Queue
-        if queue_info['queue']:
-            queue_text = ""
-            for i, track in enumerate(queue_info['queue'], 1):
-                queue_text += f"**{i}.** {track.title}\n"
-                
-            embed.add_field(
-                name=f"📋 Up Next ({len(queue_info['queue'])} tracks)",
-                value=queue_text[:1024],  # Discord embed field limit
-                inline=False
-            )
-            
-        await interaction.response.send_message(embed=embed)
+        # Buttons only when there is more than one page
+        embed = build_queue_embed(player, 0)
+        if page_count(player.queue) > 1:
+            await interaction.response.send_message(embed=embed, view=QueueView(interaction.guild_id))
+        else:
+            await interaction.response.send_message(embed=embed)
         
     @app_commands.command(name="skip", description="Skip the current song")
     async def skip(self, interaction: discord.Interaction):
@@ -78,21 +188,26 @@ class QueueCommands(commands.Cog):
             )
             return
             
-        player = audio_manager.get_player(interaction.guild_id)
+        player = audio_manager.peek_player(interaction.guild_id)
         
-        if not player.is_playing or not player.current_track:
+        if not player or not player.is_playing or not player.current_track:
             await interaction.response.send_message("❌ No music is currently playing.")
             return
             
-        # Skip current track
-        next_track = player.skip_current()
+        # The skip waits its turn behind any transition the player is in the
+        # middle of (resolving or restarting a stream), which can take longer
+        # than Discord's response deadline
+        await interaction.response.defer()
+        
+        # Skip current track; the player stops the voice client and advances
+        next_track = await player.skip()
         
         if next_track:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"⏭️ Skipped! Now playing: **{next_track.title}**"
             )
         else:
-            await interaction.response.send_message("⏹️ Stopped playback - no more tracks in queue.")
+            await interaction.followup.send("⏹️ Stopped playback - no more tracks in queue.")
             
     @app_commands.command(name="stop", description="Stop playback and clear the queue")
     async def stop(self, interaction: discord.Interaction):
@@ -106,16 +221,20 @@ class QueueCommands(commands.Cog):
             )
             return
             
-        player = audio_manager.get_player(interaction.guild_id)
+        player = audio_manager.peek_player(interaction.guild_id)
         
-        if not player.is_playing and not player.queue:
+        if not player or (not player.is_playing and not player.queue):
             await interaction.response.send_message("❌ No music is currently playing or queued.")
             return
             
+        # Like the other queue edits, the stop waits its turn in the player's
+        # command inbox, so answer through the followup
+        await interaction.response.defer()
+        
         # Stop playback
-        player.stop_playback()
+        await player.stop()
         
-        await interaction.response.send_message("⏹️ Stopped playback and cleared the queue.")
+        await interaction.followup.send("⏹️ Stopped playback and cleared the queue.")
         
     @app_commands.command(name="remove", description="Remove a song from the queue")
     @app_commands.describe(position="Position of the song to remove (1, 2, 3, etc.)")
@@ -130,9 +249,9 @@ class QueueCommands(commands.Cog):
             )
             return
             
-        player = audio_manager.get_player(interaction.guild_id)
+        player = audio_manager.peek_player(interaction.guild_id)
         
-        if not player.queue:
+        if not player or not player.queue:
             await interaction.response.send_message("❌ The queue is empty.")
             return
             
@@ -145,15 +264,18 @@ class QueueCommands(commands.Cog):
             )
             return
             
+        # Queue edits wait behind any transition in progress, so answer through the followup
+        await interaction.response.defer()
+        
         # Remove track
-        removed_track = player.remove_track(queue_position)
+        removed_track = await player.remove(queue_position)
         
         if removed_track:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"🗑️ Removed **{removed_track.title}** from the queue."
             )
         else:
-            await interaction.response.send_message("❌ Failed to remove track.")
+            await interaction.followup.send("❌ Failed to remove track.")
             
     @app_commands.command(name="move", description="Move a song to a different position in the queue")
     @app_commands.describe(
@@ -171,9 +293,9 @@ class QueueCommands(commands.Cog):
             )
             return
             
-        player = audio_manager.get_player(interaction.guild_id)
+        player = audio_manager.peek_player(interaction.guild_id)
         
-        if not player.queue:
+        if not player or not player.queue:
             await interaction.response.send_message("❌ The queue is empty.")
             return
             
@@ -192,16 +314,18 @@ class QueueCommands(commands.Cog):
             await interaction.response.send_message("❌ Cannot move to the same position.")
             return
             
+        # Queue edits wait behind any transition in progress, so answer through the followup
+        await interaction.response.defer()
+        
         # Move track
-        success = player.move_track(from_pos, to_pos)
+        moved_track = await player.move(from_pos, to_pos)
         
-        if success:
-            moved_track = player.queue[to_pos]
-            await interaction.response.send_message(
+        if moved_track:
+            await interaction.followup.send(
                 f"🔄 Moved **{moved_track.title}** from position {from_position} to {to_position}."
             )
         else:
-            await interaction.response.send_message("❌ Failed to move track.")
+            await interaction.followup.send("❌ Failed to move track.")
 
 async def setup(bot: commands.Bot):
     """Set up the queue commands cog."""
@@ -30,6 +30,101 @@ class Config:
     # Bot Configuration
     BOT_PREFIX = os.getenv('BOT_PREFIX', '!')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Log output: 'json' (one object per line) or 'text'
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    # Records buffered for the log writer thread; further records are dropped
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # Per-module rate limits (records per second) for messages below WARNING
+    LOG_RATE_LIMITS = os.getenv(
+        'LOG_RATE_LIMITS',
+        'src.services.audio_player=20,src.services.youtube_service=20,src.commands=20'
+    )
+    
+    # Sharding
+    # Total shards (0 = use Discord's recommendation)
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0'))
+    # Worker processes the shards are spread over; 1 runs every shard in this process
+    SHARD_PROCESSES = int(os.getenv('SHARD_PROCESSES', '1'))
+    # Set by the sharding supervisor for each worker process
+    SHARD_IDS = [
+        int(shard_id.strip())
+        for shard_id in os.getenv('SHARD_IDS', '').split(',')
+        if shard_id.strip()
+    ]
+    WORKER_INDEX = int(os.getenv('WORKER_INDEX', '0'))
+    
+    # yt-dlp Extraction
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '4'))
+    EXTRACTION_CONCURRENCY = int(os.getenv('EXTRACTION_CONCURRENCY', '4'))
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '20'))
+    
+    # Run extractions in this many worker processes instead of threads (0 = threads only)
+    EXTRACTION_PROCESSES = int(os.getenv('EXTRACTION_PROCESSES', '0'))
+    # Requests in flight to the worker processes before callers have to wait
+    EXTRACTION_MAX_PENDING = int(os.getenv('EXTRACTION_MAX_PENDING', '32'))
+    EXTRACTION_HEALTH_INTERVAL = float(os.getenv('EXTRACTION_HEALTH_INTERVAL', '10'))
+    
+    PLAYLIST_MAX_TRACKS = int(os.getenv('PLAYLIST_MAX_TRACKS', '500'))
+    # Threads enumerating playlists, separate from the search/stream extraction threads
+    PLAYLIST_WORKERS = int(os.getenv('PLAYLIST_WORKERS', '2'))
+    # Pooled YoutubeDL instances are rebuilt after this many uses or seconds
+    YTDL_RECYCLE_USES = int(os.getenv('YTDL_RECYCLE_USES', '200'))
+    YTDL_RECYCLE_SECONDS = float(os.getenv('YTDL_RECYCLE_SECONDS', '1800'))
+    
+    # In-memory Extraction Cache
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '2048'))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '86400'))
+    STREAM_CACHE_TTL = float(os.getenv('STREAM_CACHE_TTL', '3600'))
+    
+    # Audio Quality
+    DEFAULT_AUDIO_PRESET = os.getenv('DEFAULT_AUDIO_PRESET', 'balanced')
+    # Aggregate outbound voice bitrate (kbps) that switches every guild to the
+    # low bandwidth preset; 0 disables the automatic switch
+    MAX_OUTBOUND_KBPS = int(os.getenv('MAX_OUTBOUND_KBPS', '0'))
+    
+    # Idle Players
+    # Seconds a guild may sit idle before it is disconnected and its player evicted
+    IDLE_TIMEOUT = float(os.getenv('IDLE_TIMEOUT', '60'))
+    # Seconds a disconnected guild keeps its queued tracks before its player is evicted too
+    IDLE_QUEUE_TIMEOUT = float(os.getenv('IDLE_QUEUE_TIMEOUT', '1800'))
+    REAPER_INTERVAL = float(os.getenv('REAPER_INTERVAL', '15'))
+    
+    # FFmpeg Process Supervision
+    # Maximum concurrent FFmpeg processes across all guilds (0 = unlimited);
+    # further tracks wait for a free slot
+    FFMPEG_MAX_PROCESSES = int(os.getenv('FFMPEG_MAX_PROCESSES', '64'))
+    FFMPEG_NICE = int(os.getenv('FFMPEG_NICE', '5'))
+    # Address space limit per FFmpeg process in MB (0 = no limit)
+    FFMPEG_MEMORY_LIMIT_MB = int(os.getenv('FFMPEG_MEMORY_LIMIT_MB', '0'))
+    FFMPEG_MONITOR_INTERVAL = float(os.getenv('FFMPEG_MONITOR_INTERVAL', '15'))
+    # Times a stream that dies mid-track is resumed before moving on
+    FFMPEG_MAX_RESTARTS = int(os.getenv('FFMPEG_MAX_RESTARTS', '2'))
+    
+    # Metrics Endpoint (Prometheus text format at /metrics; port 0 disables it)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    
+    # Slash command sync is skipped while the command definitions hash to the value
+    # stored here (empty = sync on every start)
+    COMMAND_HASH_PATH = os.getenv('COMMAND_HASH_PATH', 'data/command_tree.sha256')
+    
+    # Persistent Metadata Store (leave empty to disable)
+    METADATA_DB_PATH = os.getenv('METADATA_DB_PATH', '')
+    
+    # Disk Audio Cache of Opus files for popular tracks (leave the directory empty to disable)
+    AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', '')
+    AUDIO_CACHE_MAX_MB = int(os.getenv('AUDIO_CACHE_MAX_MB', '2048'))
+    # Plays of a track before it is downloaded into the cache
+    AUDIO_CACHE_MIN_PLAYS = int(os.getenv('AUDIO_CACHE_MIN_PLAYS', '3'))
+    # Longer tracks (mixes, long VODs) are never cached
+    AUDIO_CACHE_MAX_TRACK_SECONDS = int(os.getenv('AUDIO_CACHE_MAX_TRACK_SECONDS', '900'))
+    AUDIO_CACHE_DOWNLOADS = int(os.getenv('AUDIO_CACHE_DOWNLOADS', '2'))
+    
+    # Journal of guild queues resumed after a restart (leave empty to disable)
+    SESSION_JOURNAL_PATH = os.getenv('SESSION_JOURNAL_PATH', '')
+    # Seconds between incremental session snapshots
+    SESSION_SNAPSHOT_INTERVAL = float(os.getenv('SESSION_SNAPSHOT_INTERVAL', '5'))
     
     @classmethod
     def validate(cls) -> bool:
@@ -1,33 +1,192 @@
 """
 Logging configuration for Groove Deck Discord bot.
+
+Records are handed to a background thread through a bounded queue, so a slow
+stdout never blocks the event loop; when the queue is full, records are
+dropped and counted instead. Output is one JSON object per line (or plain
+text with LOG_FORMAT=text) carrying the guild the record was logged for.
+Chatty modules are rate limited below WARNING.
 """
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Tuple
 from src.config import Config
 
-def setup_logger(name: str = "groove_deck") -> logging.Logger:
-    """Set up and configure the logger."""
-    logger = logging.getLogger(name)
-    
-    # Set log level from config
+# Guild the current task is working for; set per command and per player task
+_guild_context: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('guild_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'guild_id', 'sampled_out'}
+
+def set_log_context(guild_id: Optional[int]) -> None:
+    """Tag records logged from the current task (and tasks it creates) with a guild."""
+    _guild_context.set(guild_id)
+
+class ContextFilter(logging.Filter):
+    """Adds the current guild to records that were not given one explicitly."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'guild_id'):
+            record.guild_id = _guild_context.get()
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger prefix for records below WARNING.
+
+    Records over the limit are dropped; the next record let through carries
+    how many were dropped in its 'sampled_out' field.
+    """
+
+    def __init__(self, limits: Dict[str, float], burst_seconds: float = 2.0):
+        super().__init__()
+        # Longest prefix first so 'src.commands.play' beats 'src.commands'
+        self.limits = sorted(limits.items(), key=lambda item: -len(item[0]))
+        self.burst_seconds = burst_seconds
+        # prefix -> [tokens, last refill, dropped]
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _prefix(self, name: str) -> Optional[Tuple[str, float]]:
+        for prefix, rate in self.limits:
+            if name == prefix or name.startswith(prefix + '.'):
+                return prefix, rate
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        match = self._prefix(record.name)
+        if match is None:
+            return True
+        prefix, rate = match
+        capacity = max(1.0, rate * self.burst_seconds)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(prefix)
+            if bucket is None:
+                bucket = self._buckets[prefix] = [capacity, now, 0]
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.sampled_out = bucket[2]
+                bucket[2] = 0
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        guild_id = getattr(record, 'guild_id', None)
+        if guild_id is not None:
+            entry['guild_id'] = guild_id
+        sampled_out = getattr(record, 'sampled_out', None)
+        if sampled_out:
+            entry['sampled_out'] = sampled_out
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """The original plain text format, with the guild appended when known."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        guild_id = getattr(record, 'guild_id', None)
+        return f'{text} [guild={guild_id}]' if guild_id is not None else text
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records are dropped when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the %-args here (the args may change after this call returns)
+        # but leave JSON encoding and I/O to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse 'logger=rate,...' (records per second) into a dict."""
+    limits = {}
+    for item in spec.split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            limits[name.strip()] = float(rate)
+    return limits
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging() -> None:
+    """Route all logging through the queue and background listener (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
     log_level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
-    logger.setLevel(log_level)
-    
-    # Create console handler if none exists
-    if not logger.handlers:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(formatter)
-        
-        # Add handler to logger
-        logger.addHandler(console_handler)
-    
-    return logger
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(TextFormatter() if Config.LOG_FORMAT == 'text' else JsonFormatter())
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(RateLimitFilter(parse_rate_limits(Config.LOG_RATE_LIMITS)))
+
+    root = logging.getLogger()
+    root.setLevel(log_level)
+    root.handlers = [queue_handler]
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def setup_logger(name: str = "groove_deck") -> logging.Logger:
+    """Set up logging and get a logger."""
+    setup_logging()
+    return logging.getLogger(name)
 
 # Create default logger instance
 logger = setup_logger()
@@ -0,0 +1,283 @@
+"""
+Disk cache of Opus files for frequently played tracks.
+
+Tracks played often enough are downloaded once in the background and stored
+as Ogg Opus files named after their video id. Cached tracks are then played
+from disk through the passthrough path: no yt-dlp extraction, no network
+stream and no transcode. The directory is kept under a size limit by deleting
+the least recently played files.
+"""
+import asyncio
+import logging
+import os
+import re
+import shlex
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+from src.config import Config
+from src.services.track import Track
+from src.services.youtube_service import youtube_service
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor
+from src.services.playback import FFMPEG_BEFORE_OPTIONS
+from src.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Best Opus stream when there is one, so downloads are usually a plain remux
+CACHE_FORMAT = 'bestaudio[acodec=opus]/bestaudio'
+# Encoding bitrate (kbps) for sources that are not Opus
+CACHE_BITRATE = 128
+DOWNLOAD_TIMEOUT = 300
+# Play counters kept for tracks that are not cached yet
+MAX_TRACKED_PLAYS = 10000
+
+# YouTube video ids; anything else (other sites, raw URLs) is not cached
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+# <video id>-<kbps>.opus
+_CACHE_FILE = re.compile(r'^([A-Za-z0-9_-]{11})-(\d+)\.opus$')
+
+class AudioCache:
+    """
+    Size-bounded LRU of Opus files on disk, filled by play count.
+
+    The index (video id -> path, bitrate, size) lives in memory and is
+    rebuilt from the directory on open, ordered by file modification time;
+    a cache hit touches the file so the order survives restarts.
+    """
+
+    def __init__(self, max_bytes: int = Config.AUDIO_CACHE_MAX_MB * 1024 * 1024,
+                 min_plays: int = Config.AUDIO_CACHE_MIN_PLAYS,
+                 max_track_seconds: int = Config.AUDIO_CACHE_MAX_TRACK_SECONDS,
+                 downloads: int = Config.AUDIO_CACHE_DOWNLOADS):
+        self.directory: Optional[str] = None
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.max_track_seconds = max_track_seconds
+        self._entries: 'OrderedDict[str, Tuple[str, int, int]]' = OrderedDict()
+        self._plays: 'OrderedDict[str, int]' = OrderedDict()
+        self._downloads: Dict[str, asyncio.Task] = {}
+        self._download_slots = asyncio.Semaphore(max(1, downloads))
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.downloaded = 0
+        self.failed = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def open(self, directory: str) -> None:
+        """
+        Enable the cache and index the files already in its directory.
+
+        Args:
+            directory: Cache directory, created if missing
+        """
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.part'):
+                # Left over from a download interrupted by a restart (newer ones may
+                # belong to another shard worker sharing the directory)
+                if time.time() - os.path.getmtime(path) > DOWNLOAD_TIMEOUT:
+                    _remove(path)
+                continue
+            match = _CACHE_FILE.match(name)
+            if match is None:
+                continue
+            stat = os.stat(path)
+            found.append((stat.st_mtime, match.group(1), path, int(match.group(2)), stat.st_size))
+
+        self.directory = directory
+        for _, video_id, path, bitrate, size in sorted(found):
+            self._entries[video_id] = (path, bitrate, size)
+            self.total_bytes += size
+        self._evict()
+        logger.info("Audio cache at %s holds %s track(s), %.1f MB",
+                    directory, len(self._entries), self.total_bytes / 1024 / 1024)
+
+    async def close(self) -> None:
+        """Cancel running downloads (their partial files are removed)."""
+        tasks = list(self._downloads.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def contains(self, video_id: str) -> bool:
+        """Check the index for a track without touching the disk."""
+        return video_id in self._entries
+
+    def lookup(self, video_id: str) -> Optional[Dict]:
+        """
+        Get a cached track as stream info for the playback engine.
+
+        Args:
+            video_id: YouTube video id
+
+        Returns:
+            Stream info with the local file as 'url' and 'local' set, or None if not cached
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(video_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        path, bitrate, size = entry
+        try:
+            # Recency is kept in the file's mtime so the LRU order survives restarts
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back (another shard worker evicted it, or by hand)
+            self._drop(video_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(video_id)
+        self.hits += 1
+        return {'url': path, 'acodec': 'opus', 'abr': bitrate, 'local': True}
+
+    def record_play(self, track: Track) -> None:
+        """Count a play streamed from YouTube, downloading the track once it is popular."""
+        if not self.enabled or not _VIDEO_ID.match(track.video_id):
+            return
+        if not track.duration or track.duration > self.max_track_seconds:
+            return
+        video_id = track.video_id
+        if video_id in self._entries or video_id in self._downloads:
+            return
+
+        plays = self._plays.pop(video_id, 0) + 1
+        self._plays[video_id] = plays
+        if len(self._plays) > MAX_TRACKED_PLAYS:
+            self._plays.popitem(last=False)
+        if plays < self.min_plays:
+            return
+
+        del self._plays[video_id]
+        task = asyncio.get_running_loop().create_task(self._download(track))
+        self._downloads[video_id] = task
+        task.add_done_callback(lambda _: self._downloads.pop(video_id, None))
+
+    async def _download(self, track: Track) -> None:
+        """Fetch a track's audio into the cache with FFmpeg (remux when already Opus)."""
+        async with self._download_slots:
+            stream = await youtube_service.resolve_stream(track.url, CACHE_FORMAT)
+            if not stream:
+                self._failed(track, "no stream")
+                return
+
+            copy = stream.get('acodec') in ('opus', 'libopus')
+            bitrate = int(stream['abr']) if copy and stream.get('abr') else CACHE_BITRATE
+            path = os.path.join(self.directory, f"{track.video_id}-{bitrate}.opus")
+            # Unique per process: shard workers may share the directory
+            part = f"{path}.{os.getpid()}.part"
+            args = ['ffmpeg', '-nostdin', '-v', 'error', '-y',
+                    *shlex.split(FFMPEG_BEFORE_OPTIONS), '-i', stream['url'],
+                    '-vn', '-map_metadata', '-1']
+            args += ['-c:a', 'copy'] if copy else ['-c:a', 'libopus', '-b:a', f'{bitrate}k']
+            args += ['-f', 'opus', part]
+
+            started = time.monotonic()
+            # Downloads count against the global FFmpeg cap like voice streams,
+            # at most AUDIO_CACHE_DOWNLOADS of its slots at a time
+            await ffmpeg_supervisor.acquire()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+                )
+            except BaseException:
+                ffmpeg_supervisor.release()
+                raise
+            # Registered for the process count and CPU/RSS figures, with the same limits
+            ffmpeg_supervisor.register(None, process)
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=DOWNLOAD_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                process.kill()
+                await process.wait()
+                _remove(part)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self._failed(track, f"timed out after {DOWNLOAD_TIMEOUT}s")
+                return
+            finally:
+                ffmpeg_supervisor.unregister_process(process)
+
+            if process.returncode != 0:
+                _remove(part)
+                self._failed(track, stderr.decode(errors='replace').strip()[-200:] or f"exit code {process.returncode}")
+                return
+
+            # The FFmpeg slot is already released; a failure here (disk full, directory
+            # removed, another worker's file in the way) must not leave the .part behind
+            try:
+                os.replace(part, path)
+                size = os.path.getsize(path)
+            except OSError as e:
+                _remove(part)
+                self._failed(track, f"could not store the file: {e}")
+                return
+            self._entries[track.video_id] = (path, bitrate, size)
+            self.total_bytes += size
+            self.downloaded += 1
+            DOWNLOADS.inc(result='ok')
+            logger.info("Cached '%s' (%.1f MB, %skbps) in %.1fs",
+                        track.title, size / 1024 / 1024, bitrate, time.monotonic() - started)
+            self._evict()
+
+    def _failed(self, track: Track, reason: str) -> None:
+        self.failed += 1
+        DOWNLOADS.inc(result='failed')
+        logger.warning("Could not cache '%s': %s", track.title, reason)
+
+    def _evict(self) -> None:
+        """Delete least recently played files until the cache fits its size limit."""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            video_id, (path, _, _) = next(iter(self._entries.items()))
+            self._drop(video_id)
+            _remove(path)
+            self.evicted += 1
+
+    def _drop(self, video_id: str) -> None:
+        _, _, size = self._entries.pop(video_id)
+        self.total_bytes -= size
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/download counters."""
+        return {
+            'enabled': self.enabled,
+            'tracks': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'downloading': len(self._downloads),
+            'downloaded': self.downloaded,
+            'failed': self.failed,
+            'evicted': self.evicted
+        }
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# Global audio cache instance (enabled by open())
+audio_cache = AudioCache()
+
+DOWNLOADS = registry.counter(
+    'groove_deck_audio_cache_downloads_total',
+    'Tracks downloaded into the disk audio cache by result',
+    ('result',)
+)
+registry.counter('groove_deck_audio_cache_hits_total', 'Tracks played from the disk audio cache',
+                 collect=lambda: audio_cache.hits)
+registry.counter('groove_deck_audio_cache_misses_total', 'Track starts not found in the disk audio cache',
+                 collect=lambda: audio_cache.misses)
+registry.gauge('groove_deck_audio_cache_bytes', 'Size of the disk audio cache',
+               collect=lambda: audio_cache.total_bytes)
@@ -3,107 +3,760 @@ Audio player service for managing music queues and playback.
 """
 import asyncio
 import logging
-from typing import List, Optional, Dict
-from dataclasses import dataclass
-from discord import VoiceChannel, VoiceClient, FFmpegPCMAudio
-from discord.ext import commands
-import yt_dlp
+import time
+from collections import deque
+from enum import Enum
+from typing import List, Optional, Dict, Deque, Tuple
+from discord import VoiceChannel, VoiceClient
+
+from src.config import Config
+from src.audio_config.audio_config import AudioConfig
+from src.services.youtube_service import youtube_service
+from src.services.playback import playback_engine
+from src.services.audio_cache import audio_cache
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor, SupervisedFFmpegOpusAudio
+from src.services.metrics import registry, PLAY_LATENCY, TRACKS_STARTED
+from src.logger import set_log_context
+from src.services.track import Track
+from src.services.track_queue import TrackQueue
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class Track:
-    """Represents a music track."""
-    title: str
-    url: str
-    duration: Optional[int] = None
-    requester_id: Optional[int] = None
+# Low bandwidth mode switches off again once outbound bitrate drops below this share of the limit
+LOW_BANDWIDTH_RELEASE_RATIO = 0.8
+
+# A stream ending more than this many seconds before the track's duration is treated as having died
+STREAM_END_TOLERANCE = 5
+
+class PlayerState(Enum):
+    """Playback states of a guild's audio player."""
+    IDLE = 'idle'            # nothing playing, queue may be empty
+    RESOLVING = 'resolving'  # resolving the stream / building the source for the next track
+    PLAYING = 'playing'      # voice client is streaming current_track
+    PAUSED = 'paused'        # current_track is loaded but paused
+    DRAINING = 'draining'    # voice client was stopped, waiting for the track-end event
 
 class AudioPlayer:
-    """Manages audio playback and queue for a single guild."""
+    """
+    Manages audio playback and queue for a single guild.
     
-    def __init__(self, guild_id: int):
+    Playback transitions run on a per-guild asyncio task that consumes a
+    command inbox, so they happen one at a time on the event loop. Track-end
+    notifications from discord.py's audio thread are marshalled back onto the
+    loop and delivered through the same inbox.
+    """
+    
+    def __init__(self, guild_id: int, manager: Optional['AudioManager'] = None):
         self.guild_id = guild_id
-        self.queue: List[Track] = []
+        self.manager = manager
+        self.queue = TrackQueue()
         self.current_track: Optional[Track] = None
         self.voice_client: Optional[VoiceClient] = None
-        self.is_playing = False
+        self.state = PlayerState.IDLE
         self.loop = False
+        # Audio preset chosen for this guild, overridden by low bandwidth mode
+        self.preset_name = Config.DEFAULT_AUDIO_PRESET
+        self.low_bandwidth = False
+        # Playback path (passthrough/transcode) and bitrate of the current stream
+        self.stream_path: Optional[str] = None
+        self.stream_bitrate = 0
+        # Source of the current track, used for its position and to resume it
+        self.source: Optional[SupervisedFFmpegOpusAudio] = None
+        self._restarts = 0
+        # Background stream URL resolution for the head of the queue
+        self._prefetch_track: Optional[Track] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+        # Command inbox and the task consuming it, created on first use. A
+        # deque (rather than asyncio.Queue) lets the task look ahead and
+        # coalesce runs of pending commands
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inbox: Deque[Tuple[str, tuple, Optional[asyncio.Future]]] = deque()
+        self._inbox_ready: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Set when the head of the queue changed; the prefetch is re-targeted
+        # once the inbox is drained instead of after every mutation
+        self._head_dirty = False
+        # Bumped for every started track so stale track-end events are ignored
+        self._generation = 0
+        # Bumped by stop_playback() so an in-progress transition is abandoned
+        self._epoch = 0
+        # When the player last went idle (monotonic), None while a track is loaded
+        self.idle_since: Optional[float] = time.monotonic()
+        
+    @property
+    def is_playing(self) -> bool:
+        """Whether a track is loaded (resolving, playing, paused or draining)."""
+        return self.state is not PlayerState.IDLE
+        
+    async def connect(self, channel: VoiceChannel) -> VoiceClient:
+        """Connect to a voice channel, reusing or moving an existing connection."""
+        voice_client = self.voice_client or channel.guild.voice_client
+        if voice_client and voice_client.is_connected():
+            if voice_client.channel != channel:
+                await voice_client.move_to(channel)
+        else:
+            voice_client = await channel.connect()
+        self.voice_client = voice_client
+        self.touch()
+        return voice_client
+        
+    async def disconnect(self) -> None:
+        """Leave the voice channel, keeping the queue."""
+        voice_client, self.voice_client = self.voice_client, None
+        if voice_client and voice_client.is_connected():
+            await voice_client.disconnect()
+            logger.info("Disconnected idle voice client in guild %s", self.guild_id)
+            
+    def touch(self) -> None:
+        """Restart the idle timer so the reaper leaves a player that is about to be used."""
+        if self.idle_since is not None:
+            self.idle_since = time.monotonic()
+            
+    def idle_for(self, now: Optional[float] = None) -> float:
+        """Seconds this player has been idle (0 while a track is loaded)."""
+        if self.state is not PlayerState.IDLE or self.idle_since is None:
+            return 0.0
+        return (now if now is not None else time.monotonic()) - self.idle_since
         
     def add_track(self, track: Track) -> None:
         """Add a track to the queue."""
         self.queue.append(track)
-        logger.info(f"Added track '{track.title}' to queue for guild {self.guild_id}")
+        logger.info("Added track '%s' to queue for guild %s", track.title, self.guild_id)
+        if len(self.queue) == 1:
+            self._on_head_changed()
         
     def remove_track(self, position: int) -> Optional[Track]:
         """Remove a track from the queue by position."""
-        if 0 <= position < len(self.queue):
-            track = self.queue.pop(position)
-            logger.info(f"Removed track '{track.title}' from position {position}")
-            return track
-        return None
+        track = self.queue.remove_at(position)
+        if track:
+            logger.info("Removed track '%s' from position %s", track.title, position)
+            if position == 0:
+                self._on_head_changed()
+        return track
         
     def move_track(self, from_pos: int, to_pos: int) -> bool:
         """Move a track from one position to another in the queue."""
-        if (0 <= from_pos < len(self.queue) and 
-            0 <= to_pos < len(self.queue) and 
-            from_pos != to_pos):
-            track = self.queue.pop(from_pos)
-            self.queue.insert(to_pos, track)
-            logger.info(f"Moved track '{track.title}' from position {from_pos} to {to_pos}")
+        if from_pos == to_pos:
+            return False
+        track = self.queue.move(from_pos, to_pos)
+        if track:
+            logger.info("Moved track '%s' from position %s to %s", track.title, from_pos, to_pos)
+            if from_pos == 0 or to_pos == 0:
+                self._on_head_changed()
             return True
         return False
         
-    def skip_current(self) -> Optional[Track]:
-        """Skip the current track and return the next one."""
-        if self.current_track:
-            logger.info(f"Skipped track '{self.current_track.title}'")
-            
-        if self.queue:
-            self.current_track = self.queue.pop(0)
-            return self.current_track
-        else:
-            self.current_track = None
-            self.is_playing = False
-            return None
+    async def enqueue(self, track: Track) -> None:
+        """Add a track to the queue through the player task."""
+        await self._submit('add', track)
+        
+    async def remove(self, position: int) -> Optional[Track]:
+        """Remove a track by 0-based position through the player task."""
+        return await self._submit('remove', position)
+        
+    async def move(self, from_pos: int, to_pos: int) -> Optional[Track]:
+        """Move a track between 0-based positions through the player task, returning it."""
+        return await self._submit('move', from_pos, to_pos)
+        
+    async def play(self, requested_at: Optional[float] = None, start_offset: float = 0.0) -> bool:
+        """
+        Start playing the queue if the player is idle.
+        
+        Args:
+            requested_at: time.monotonic() when the user asked for playback, for latency metrics
+            start_offset: Seconds into the first track to start from (used to resume a restored session)
             
+        Returns:
+            True if a track is playing afterwards, False if nothing could be started
+        """
+        return await self._submit('play', requested_at, start_offset)
+        
+    async def skip(self) -> Optional[Track]:
+        """
+        Skip the current track.
+        
+        Skips that pile up while the player is busy are merged into a single
+        "advance N" so only the final target track is resolved and started.
+        
+        Returns:
+            The track that will play next, or None if the queue is exhausted
+        """
+        return await self._submit('skip')
+        
+    async def pause(self) -> bool:
+        """Pause the current track. Returns False if nothing is playing."""
+        return await self._submit('pause')
+        
+    async def resume(self) -> bool:
+        """Resume a paused track. Returns False if nothing is paused."""
+        return await self._submit('resume')
+        
+    async def stop(self) -> None:
+        """Stop playback and clear the queue through the player task."""
+        await self._submit('stop')
+        
     def stop_playback(self) -> None:
-        """Stop playback and clear the queue."""
+        """Stop playback and clear the queue (run by the player task, or after it is cancelled)."""
+        self._epoch += 1
+        self._generation += 1
         self.queue.clear()
         self.current_track = None
-        self.is_playing = False
+        self.source = None
+        self.state = PlayerState.IDLE
+        self.idle_since = time.monotonic()
+        self.invalidate_prefetch()
         if self.voice_client:
             self.voice_client.stop()
-        logger.info(f"Stopped playback for guild {self.guild_id}")
+        self._notify_manager()
+        logger.info("Stopped playback for guild %s", self.guild_id)
+        
+    async def close(self) -> None:
+        """Stop playback, disconnect and shut down the command task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self.stop_playback()
+        if self.voice_client and self.voice_client.is_connected():
+            await self.voice_client.disconnect()
+        self.voice_client = None
+        
+    async def _submit(self, command: str, *args):
+        """Queue a command for the player task and wait for its result."""
+        self._ensure_worker()
+        future = self._event_loop.create_future()
+        self._post(command, args, future)
+        return await future
+        
+    def _post(self, command: str, args: tuple, future: Optional[asyncio.Future] = None) -> None:
+        """Append a command to the inbox and wake the player task."""
+        self._inbox.append((command, args, future))
+        self._inbox_ready.set()
+        
+    def _ensure_worker(self) -> None:
+        """Start the per-guild command task on the running loop if needed."""
+        if self._worker is None or self._worker.done():
+            self._event_loop = asyncio.get_running_loop()
+            self._inbox_ready = asyncio.Event()
+            if self._inbox:
+                self._inbox_ready.set()
+            self._worker = self._event_loop.create_task(self._run())
+            
+    async def _run(self) -> None:
+        """Consume the command inbox, applying one transition at a time."""
+        # Everything logged from this task (and the prefetches it starts) carries the guild
+        set_log_context(self.guild_id)
+        handlers = {
+            'add': self._handle_add,
+            'remove': self._handle_remove,
+            'move': self._handle_move,
+            'play': self._handle_play,
+            'skip': self._handle_skip,
+            'pause': self._handle_pause,
+            'resume': self._handle_resume,
+            'stop': self._handle_stop,
+            'track_end': self._handle_track_end
+        }
+        while True:
+            if not self._inbox:
+                # Inbox drained: apply the coalesced head change before sleeping
+                if self._head_dirty:
+                    self._head_dirty = False
+                    self._retarget_prefetch()
+                self._inbox_ready.clear()
+                await self._inbox_ready.wait()
+                continue
+                
+            command, args, future = self._inbox.popleft()
+            futures = [future]
+            if command == 'skip':
+                # Collapse a run of pending skips into one advance-by-N
+                while self._inbox and self._inbox[0][0] == 'skip':
+                    futures.append(self._inbox.popleft()[2])
+                args = (len(futures),)
+                if len(futures) > 1:
+                    logger.debug("Coalesced %s skips for guild %s", len(futures), self.guild_id)
+                    
+            try:
+                result = await handlers[command](*args)
+            except Exception as e:
+                logger.error("Error handling '%s' for guild %s: %s", command, self.guild_id, e)
+                for pending in futures:
+                    if pending is not None and not pending.done():
+                        pending.set_exception(e)
+                continue
+            for pending in futures:
+                if pending is not None and not pending.done():
+                    pending.set_result(result)
+                    
+    async def _handle_add(self, track: Track) -> None:
+        self.add_track(track)
+        
+    async def _handle_remove(self, position: int) -> Optional[Track]:
+        return self.remove_track(position)
+        
+    async def _handle_move(self, from_pos: int, to_pos: int) -> Optional[Track]:
+        return self.queue[to_pos] if self.move_track(from_pos, to_pos) else None
+        
+    async def _handle_play(self, requested_at: Optional[float] = None, start_offset: float = 0.0) -> bool:
+        if self.state is not PlayerState.IDLE:
+            return True
+        return await self._advance(requested_at=requested_at, start_offset=start_offset)
+        
+    async def _handle_skip(self, count: int = 1) -> Optional[Track]:
+        if self.state is PlayerState.IDLE:
+            return None
+            
+        if self.state is not PlayerState.DRAINING:
+            logger.info("Skipped track '%s'", self.current_track.title)
+            self.state = PlayerState.DRAINING
+            count -= 1
+            if self.voice_client:
+                # The after-callback delivers a track_end event that advances the queue
+                self.voice_client.stop()
+                
+        # Already moving on; every further skip drops the track that would play next
+        for _ in range(count):
+            dropped = self.queue.popleft()
+            if not dropped:
+                break
+            logger.info("Skipped queued track '%s'", dropped.title)
+            self._head_dirty = True
+            
+        return self.queue[0] if self.queue else None
+        
+    async def _handle_pause(self) -> bool:
+        if self.state is not PlayerState.PLAYING or not self.voice_client:
+            return False
+        self.voice_client.pause()
+        self.state = PlayerState.PAUSED
+        return True
+        
+    async def _handle_resume(self) -> bool:
+        if self.state is not PlayerState.PAUSED or not self.voice_client:
+            return False
+        self.voice_client.resume()
+        self.state = PlayerState.PLAYING
+        return True
+        
+    async def _handle_stop(self) -> None:
+        # Bumps the epoch and generation, so the stopped track's end event is ignored
+        self.stop_playback()
+        
+    async def _handle_track_end(self, generation: int, error: Optional[Exception],
+                                ended_at: Optional[float] = None) -> None:
+        if generation != self._generation:
+            return
+        if error:
+            logger.error("Audio playback error in guild %s: %s", self.guild_id, error)
+        # Only a stream that died (FFmpeg error or early EOF) is restarted; when
+        # voice itself went away (kicked, reaped, dropped) there is nothing to resume into
+        if (self.state is PlayerState.PLAYING and self._voice_connected()
+                and (error or self._ended_early()) and await self._restart_current()):
+            return
+        if self.state in (PlayerState.PLAYING, PlayerState.PAUSED, PlayerState.DRAINING):
+            await self._advance(previous_ended_at=ended_at)
+            
+    def _voice_connected(self) -> bool:
+        return self.voice_client is not None and self.voice_client.is_connected()
+        
+    def _ended_early(self) -> bool:
+        """Check whether the current stream stopped well before the end of the track."""
+        track = self.current_track
+        if track is None or not track.duration or self.source is None:
+            return False
+        return self.position < track.duration - STREAM_END_TOLERANCE
+        
+    async def _restart_current(self) -> bool:
+        """Resume the current track from its last position after its FFmpeg stream died."""
+        if self._restarts >= Config.FFMPEG_MAX_RESTARTS or not self._voice_connected():
+            # Checked before forget_stream(): the cached URL is fine when only voice dropped
+            return False
+        track = self.current_track
+        position = self.position
+        epoch = self._epoch
+        self._restarts += 1
+        ffmpeg_supervisor.restarts += 1
+        logger.warning("Stream for '%s' died at %.1fs in guild %s, resuming (attempt %s)",
+                       track.title, position, self.guild_id, self._restarts)
         
+        source = None
+        try:
+            # The cached URL may be what failed (expired or throttled), extract a fresh one
+            audio_format = self.audio_preset['yt_dlp_format']
+            youtube_service.forget_stream(track.url, audio_format)
+            stream = await youtube_service.resolve_stream(track.url, audio_format)
+            if epoch != self._epoch or not stream:
+                return False
+            source = await self.create_source(stream, start_offset=position)
+            if epoch != self._epoch or not self._voice_connected():
+                source.cleanup()
+                return False
+            self._generation += 1
+            generation = self._generation
+            self.voice_client.play(source, after=lambda error: self._on_track_end(generation, error))
+        except Exception as e:
+            logger.error("Could not resume '%s' in guild %s: %s", track.title, self.guild_id, e)
+            if source is not None:
+                # Never handed to the voice client: kill FFmpeg and release its supervisor slot
+                source.cleanup()
+            return False
+        return True
+            
+    async def _advance(self, requested_at: Optional[float] = None,
+                       previous_ended_at: Optional[float] = None,
+                       start_offset: float = 0.0) -> bool:
+        """
+        Start the next playable track in the queue, or go idle if there is none.
+        
+        Args:
+            requested_at: When the user asked for playback (for the /play latency metric)
+            previous_ended_at: When the previous track ended (for the inter-track gap metric)
+            start_offset: Seconds into the next track to start from; tracks after it start at 0
+        """
+        epoch = self._epoch
+        while True:
+            offset, start_offset = start_offset, 0.0
+            # Checked before popping so a voice disconnect leaves the queue intact
+            if not self._voice_connected() or not self.queue:
+                self._go_idle()
+                return False
+            track = self.queue.popleft()
+                
+            self.current_track = track
+            self.state = PlayerState.RESOLVING
+            
+            source = None
+            try:
+                # Get audio stream (usually already prefetched) in this guild's preset format
+                resolve_started = time.perf_counter()
+                stream = await self.resolve_track(track)
+                if requested_at is not None:
+                    PLAY_LATENCY.observe(time.perf_counter() - resolve_started, stage='resolve')
+                if epoch != self._epoch:
+                    return False
+                if not stream:
+                    logger.warning("Could not extract audio for '%s', skipping", track.title)
+                    continue
+                    
+                # Opus sources are passed straight through, anything else is
+                # encoded to Opus by FFmpeg rather than in the bot process
+                source = await self.create_source(stream, start_offset=offset)
+                if epoch != self._epoch or not self.voice_client:
+                    source.cleanup()
+                    return False
+                    
+                source.requested_at = requested_at
+                source.previous_ended_at = previous_ended_at
+                self._generation += 1
+                generation = self._generation
+                self._restarts = 0
+                self.voice_client.play(source, after=lambda error: self._on_track_end(generation, error))
+            except Exception as e:
+                # e.g. ClientException from play() when voice dropped during the resolve
+                logger.error("Error starting '%s' in guild %s: %s", track.title, self.guild_id, e)
+                if source is not None:
+                    # Never handed to the voice client: kill FFmpeg and release its supervisor slot
+                    source.cleanup()
+                if epoch != self._epoch:
+                    return False
+                continue
+                
+            self.state = PlayerState.PLAYING
+            self.idle_since = None
+            TRACKS_STARTED.inc(path=self.stream_path)
+            if not stream.get('local'):
+                audio_cache.record_play(track)
+            logger.info("Now playing '%s' in guild %s", track.title, self.guild_id)
+            
+            self.schedule_prefetch()
+            self._notify_manager()
+            return True
+            
+    def _on_track_end(self, generation: int, error: Optional[Exception]) -> None:
+        """After-callback run on discord.py's audio thread; hands the event to the loop."""
+        if self._event_loop is None or self._event_loop.is_closed():
+            return
+        ended_at = time.monotonic()
+        asyncio.run_coroutine_threadsafe(self._post_track_end(generation, error, ended_at), self._event_loop)
+        
+    async def _post_track_end(self, generation: int, error: Optional[Exception], ended_at: float) -> None:
+        self._post('track_end', (generation, error, ended_at))
+        
+    def _go_idle(self) -> None:
+        """Enter the idle state; the manager's reaper disconnects the player if it stays idle."""
+        self.current_track = None
+        self.source = None
+        self.state = PlayerState.IDLE
+        self.idle_since = time.monotonic()
+        self.invalidate_prefetch()
+        self._notify_manager()
+        
+    def _notify_manager(self) -> None:
+        """Let the manager re-evaluate bandwidth after a stream started or stopped."""
+        if self.manager is not None:
+            self.manager.update_bandwidth()
+            
+    @property
+    def effective_preset_name(self) -> str:
+        """Name of the preset new streams are started with."""
+        return 'low' if self.low_bandwidth else self.preset_name
+        
+    @property
+    def audio_preset(self) -> Dict:
+        """AudioConfig preset new streams are started with."""
+        return AudioConfig.get_preset(self.effective_preset_name)
+        
+    def set_preset(self, preset_name: str) -> bool:
+        """Select the audio preset for this guild; takes effect from the next track."""
+        if preset_name not in AudioConfig.list_presets():
+            return False
+        self.preset_name = preset_name
+        if self.manager is not None:
+            self.manager.guild_presets[self.guild_id] = preset_name
+        self.invalidate_prefetch()
+        self.schedule_prefetch()
+        logger.info("Audio preset for guild %s set to '%s'", self.guild_id, preset_name)
+        return True
+        
+    async def create_source(self, stream: Dict, start_offset: float = 0.0) -> SupervisedFFmpegOpusAudio:
+        """Build the audio source for a resolved stream using this guild's preset."""
+        source, self.stream_path, self.stream_bitrate = await playback_engine.create_source(
+            stream, self.audio_preset, start_offset
+        )
+        self.source = source
+        return source
+        
+    @property
+    def position(self) -> float:
+        """Seconds played of the current track."""
+        return self.source.position if self.source is not None else 0.0
+        
+    def schedule_prefetch(self) -> None:
+        """Resolve the stream URL of the next queued track while the current one plays."""
+        head = self.queue[0] if self.queue else None
+        if head is None:
+            self.invalidate_prefetch()
+            return
+            
+        if head is self._prefetch_track and self._prefetch_task is not None:
+            return
+            
+        # Cached tracks are played from disk, there is nothing to extract
+        if audio_cache.contains(head.video_id):
+            self.invalidate_prefetch()
+            return
+            
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+            
+        self.invalidate_prefetch()
+        self._prefetch_track = head
+        self._prefetch_task = loop.create_task(
+            youtube_service.resolve_stream(head.url, self.audio_preset['yt_dlp_format'])
+        )
+        logger.debug("Prefetching '%s' for guild %s", head.title, self.guild_id)
+        
+    def invalidate_prefetch(self) -> None:
+        """Drop any in-flight or completed prefetch."""
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            # The extraction thread still completes and warms the stream cache
+            self._prefetch_task.cancel()
+        self._prefetch_task = None
+        self._prefetch_track = None
+        
+    async def resolve_track(self, track: Track) -> Optional[Dict]:
+        """
+        Get the stream info for a track from the disk cache, or the prefetch when it matches.
+        
+        Args:
+            track: Track about to be played
+            
+        Returns:
+            Stream info dictionary or None if extraction fails
+        """
+        task = self._prefetch_task if track is self._prefetch_track else None
+        self._prefetch_task = None
+        self._prefetch_track = None
+        
+        cached = audio_cache.lookup(track.video_id)
+        if cached:
+            if task is not None:
+                task.cancel()
+            return cached
+            
+        if task is not None:
+            try:
+                stream = await task
+            except asyncio.CancelledError:
+                stream = None
+            if stream:
+                logger.debug("Using prefetched stream for '%s'", track.title)
+                return stream
+                
+        return await youtube_service.resolve_stream(track.url, self.audio_preset['yt_dlp_format'])
+        
+    def _on_head_changed(self) -> None:
+        """Mark the prefetch for re-targeting once pending commands are applied."""
+        self._head_dirty = True
+        if self._worker is None or self._worker.done():
+            # Mutated outside the player task; nothing will reconcile later
+            self._head_dirty = False
+            self._retarget_prefetch()
+            
+    def _retarget_prefetch(self) -> None:
+        """Point the prefetch at the current head of the queue (a no-op if it already is)."""
+        if self.is_playing:
+            self.schedule_prefetch()
+        else:
+            self.invalidate_prefetch()
+            
     def get_queue_info(self) -> Dict:
         """Get information about the current queue."""
         return {
             'current_track': self.current_track,
             'queue': self.queue,
             'is_playing': self.is_playing,
+            'state': self.state,
             'queue_length': len(self.queue)
         }
 
 class AudioManager:
-    """Manages audio players for multiple guilds."""
+    """
+    Manages audio players for multiple guilds.
+    
+    Players are created on demand by commands that change playback. A
+    background reaper disconnects players that stayed idle longer than the
+    idle timeout and evicts them once their queue is empty. Players still
+    holding a queue are evicted after the longer queue timeout, so the
+    player map only holds guilds that are actually in use.
+    """
     
-    def __init__(self):
+    def __init__(self, idle_timeout: float = Config.IDLE_TIMEOUT,
+                 queue_timeout: float = Config.IDLE_QUEUE_TIMEOUT):
         self.players: Dict[int, AudioPlayer] = {}
+        self.low_bandwidth = False
+        self.idle_timeout = idle_timeout
+        self.queue_timeout = max(queue_timeout, idle_timeout)
+        # Presets chosen with /audio_quality, kept when a guild's player is evicted
+        self.guild_presets: Dict[int, str] = {}
+        self.evicted = 0
+        self._reaper: Optional[asyncio.Task] = None
         
     def get_player(self, guild_id: int) -> AudioPlayer:
         """Get or create an audio player for a guild."""
-        if guild_id not in self.players:
-            self.players[guild_id] = AudioPlayer(guild_id)
-        return self.players[guild_id]
+        player = self.players.get(guild_id)
+        if player is None:
+            player = AudioPlayer(guild_id, manager=self)
+            player.preset_name = self.preset_name_for(guild_id)
+            player.low_bandwidth = self.low_bandwidth
+            self.players[guild_id] = player
+        player.touch()
+        return player
+        
+    def peek_player(self, guild_id: int) -> Optional[AudioPlayer]:
+        """Get a guild's audio player without creating one (for read-only commands)."""
+        return self.players.get(guild_id)
+        
+    def preset_name_for(self, guild_id: int) -> str:
+        """Get the audio preset a guild has chosen, whether or not it has a player."""
+        return self.guild_presets.get(guild_id, Config.DEFAULT_AUDIO_PRESET)
         
-    def remove_player(self, guild_id: int) -> None:
+    def outbound_kbps(self) -> int:
+        """Aggregate outbound bitrate of all voice clients currently streaming."""
+        return sum(
+            player.stream_bitrate
+            for player in self.players.values()
+            if player.state in (PlayerState.PLAYING, PlayerState.PAUSED) and player.voice_client
+        )
+        
+    def update_bandwidth(self) -> None:
+        """Toggle low bandwidth mode based on the aggregate outbound bitrate."""
+        limit = Config.MAX_OUTBOUND_KBPS
+        if limit <= 0:
+            return
+            
+        total = self.outbound_kbps()
+        if not self.low_bandwidth and total > limit:
+            self.low_bandwidth = True
+            logger.warning("Outbound bitrate %skbps exceeds %skbps, enabling low bandwidth mode", total, limit)
+        elif self.low_bandwidth and total < limit * LOW_BANDWIDTH_RELEASE_RATIO:
+            self.low_bandwidth = False
+            logger.info("Outbound bitrate %skbps back under limit, disabling low bandwidth mode", total)
+        else:
+            return
+            
+        for player in self.players.values():
+            player.low_bandwidth = self.low_bandwidth
+        
+    def start_reaper(self, interval: float = Config.REAPER_INTERVAL) -> None:
+        """Start the idle player reaper on the running loop."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_forever(interval))
+            
+    async def stop_reaper(self) -> None:
+        """Stop the idle player reaper."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+            
+    async def _reap_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error("Idle player reaper failed: %s", e)
+                
+    async def reap_idle(self) -> int:
+        """
+        Disconnect players idle for longer than the idle timeout and evict empty ones.
+        
+        Players that still hold a queue are evicted, queue and all, once they
+        have been idle for longer than the queue timeout.
+        
+        Returns:
+            Number of players evicted
+        """
+        now = time.monotonic()
+        evicted = 0
+        for guild_id, player in list(self.players.items()):
+            idle_for = player.idle_for(now)
+            if idle_for < self.idle_timeout:
+                continue
+            if not player.queue or idle_for >= self.queue_timeout:
+                if player.queue:
+                    logger.info("Dropping %s queued track(s) of guild %s after %.0fs idle",
+                                len(player.queue), guild_id, idle_for)
+                # Popped before closing, so a command arriving meanwhile gets a fresh player
+                await self.remove_player(guild_id)
+                evicted += 1
+            elif player.voice_client:
+                await player.disconnect()
+                
+        if evicted:
+            self.evicted += evicted
+            logger.info("Evicted %s idle audio player(s), %s remaining", evicted, len(self.players))
+        return evicted
+        
+    async def remove_player(self, guild_id: int) -> None:
         """Remove an audio player for a guild."""
         if guild_id in self.players:
-            player = self.players[guild_id]
-            player.stop_playback()
-            del self.players[guild_id]
-            logger.info(f"Removed audio player for guild {guild_id}")
+            player = self.players.pop(guild_id)
+            await player.close()
+            logger.info("Removed audio player for guild %s", guild_id)
 
 # Global audio manager instance
 audio_manager = AudioManager()
+
+registry.gauge('groove_deck_queue_length', 'Tracks waiting in each guild queue', ('guild',),
+               collect=lambda: {(str(guild_id),): len(player.queue)
+                                for guild_id, player in audio_manager.players.items()})
+registry.gauge('groove_deck_voice_clients', 'Connected voice clients',
+               collect=lambda: sum(1 for player in audio_manager.players.values()
+                                   if player.voice_client and player.voice_client.is_connected()))
+registry.gauge('groove_deck_players', 'Audio players held in memory',
+               collect=lambda: len(audio_manager.players))
+registry.gauge('groove_deck_outbound_kbps', 'Aggregate outbound voice bitrate',
+               collect=audio_manager.outbound_kbps)
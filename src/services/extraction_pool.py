@@ -0,0 +1,274 @@
+"""
+Out-of-process yt-dlp extraction workers.
+
+yt-dlp's regex, JSON and signature solving is CPU-bound Python; on the
+extraction threads it competes with the event loop for the GIL and adds
+jitter to voice packet timing. The pool moves it into separate processes.
+
+Protocol over a duplex pipe per worker:
+    request:  (request_id, kind, args)       kind is an EXTRACTORS name or 'ping'
+    response: (request_id, ok, result)       result is the error text when ok is False
+"""
+import itertools
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, List
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# A worker that does not answer a ping within this many seconds is replaced
+PING_TIMEOUT = 5.0
+
+class ExtractionError(Exception):
+    """Raised when an extraction failed in a worker, or the worker died or timed out."""
+
+class ExtractionBusy(ExtractionError):
+    """Raised when the pool's pending request limit is reached and no slot frees up in time."""
+
+def _worker_main(conn, ydl_opts: Dict) -> None:
+    """Worker process loop: run extraction requests one at a time."""
+    # Ctrl+C goes to the whole process group; the parent decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from src.services.youtube_service import EXTRACTORS, YoutubeDLPool
+
+    ydl_pool = YoutubeDLPool()
+    while True:
+        try:
+            request_id, kind, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        if kind == 'ping':
+            conn.send((request_id, True, None))
+            continue
+        try:
+            result = EXTRACTORS[kind](ydl_pool, ydl_opts, *args)
+            conn.send((request_id, True, result))
+        except Exception as e:
+            conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.send_lock = threading.Lock()
+        # request id -> (future, sent at, kind)
+        self.pending: Dict[int, tuple] = {}
+        self.alive = False
+
+class ExtractionProcessPool:
+    """
+    Fixed set of extraction worker processes with backpressure and health checks.
+
+    call() blocks the calling thread (an extraction thread), so the service's
+    async API is unchanged. At most max_pending requests are in flight; callers
+    beyond that wait for a slot. A monitor thread pings idle workers and
+    replaces workers that died, stopped answering or exceeded the hard timeout,
+    failing their in-flight requests.
+    """
+
+    def __init__(self, ydl_opts: Dict, processes: int = Config.EXTRACTION_PROCESSES,
+                 max_pending: int = Config.EXTRACTION_MAX_PENDING,
+                 timeout: float = Config.EXTRACTION_TIMEOUT,
+                 health_interval: float = Config.EXTRACTION_HEALTH_INTERVAL):
+        self.ydl_opts = ydl_opts
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._context = multiprocessing.get_context('spawn')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._workers = [_Worker(index) for index in range(processes)]
+        self._stopping = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self.completed = 0
+        self.failed = 0
+        self.respawns = 0
+
+    def start(self) -> None:
+        """Spawn the workers and the health monitor."""
+        for worker in self._workers:
+            self._spawn(worker)
+        self._monitor = threading.Thread(target=self._monitor_loop, name='extraction-monitor', daemon=True)
+        self._monitor.start()
+        logger.info("Started %s extraction worker process(es)", len(self._workers))
+
+    def stop(self) -> None:
+        """Stop the monitor and all workers, failing anything still pending."""
+        self._stopping.set()
+        for worker in self._workers:
+            self._retire(worker, "extraction pool stopped")
+
+    def call(self, kind: str, *args) -> Any:
+        """
+        Run an extractor in a worker and wait for its result.
+
+        Args:
+            kind: Extractor name
+            *args: Extractor arguments (must be picklable)
+
+        Returns:
+            The extractor's result
+
+        Raises:
+            ExtractionBusy: No request slot became free within the timeout
+            ExtractionError: The extraction failed, the worker died or it timed out
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ExtractionBusy(f"{kind} extraction rejected, worker pool is saturated")
+        try:
+            future = self._submit(kind, args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise ExtractionError(f"{kind} extraction timed out after {self.timeout}s")
+        finally:
+            self._slots.release()
+
+    def _submit(self, kind: str, args: tuple) -> Future:
+        """Send a request to the least loaded live worker."""
+        future: Future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            live = [worker for worker in self._workers if worker.alive]
+            if not live:
+                raise ExtractionError("No extraction worker is running")
+            worker = min(live, key=lambda w: len(w.pending))
+            worker.pending[request_id] = (future, time.monotonic(), kind)
+        try:
+            with worker.send_lock:
+                worker.conn.send((request_id, kind, args))
+        except (OSError, ValueError) as e:
+            with self._lock:
+                worker.pending.pop(request_id, None)
+            raise ExtractionError(f"Could not reach extraction worker {worker.index}: {e}")
+        return future
+
+    def _spawn(self, worker: _Worker) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.ydl_opts),
+            name=f'yt-dlp-worker-{worker.index}',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            worker.process = process
+            worker.conn = parent_conn
+            worker.alive = True
+        threading.Thread(
+            target=self._read_responses, args=(worker, parent_conn),
+            name=f'extraction-reader-{worker.index}', daemon=True
+        ).start()
+
+    def _read_responses(self, worker: _Worker, conn) -> None:
+        """Resolve futures as a worker answers; exits when its pipe closes."""
+        while True:
+            try:
+                request_id, ok, result = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                entry = worker.pending.pop(request_id, None)
+            if entry is None:
+                continue
+            future, _, kind = entry
+            if kind == 'ping':
+                future.set_result(result)
+            elif ok:
+                self.completed += 1
+                future.set_result(result)
+            else:
+                self.failed += 1
+                future.set_exception(ExtractionError(result))
+        if worker.conn is conn:
+            with self._lock:
+                worker.alive = False
+
+    def _retire(self, worker: _Worker, reason: str) -> None:
+        """Kill a worker and fail every request it still holds."""
+        with self._lock:
+            worker.alive = False
+            pending, worker.pending = worker.pending, {}
+            process, conn = worker.process, worker.conn
+        if conn is not None:
+            conn.close()
+        if process is not None and process.is_alive():
+            process.kill()
+            process.join(timeout=5)
+        for future, _, _ in pending.values():
+            if not future.done():
+                future.set_exception(ExtractionError(reason))
+
+    def _monitor_loop(self) -> None:
+        """Replace dead, hung or unresponsive workers every health interval."""
+        while not self._stopping.wait(self.health_interval):
+            now = time.monotonic()
+            for worker in self._workers:
+                with self._lock:
+                    oldest = min((sent for _, sent, _ in worker.pending.values()), default=None)
+                reason = None
+                if not worker.alive or not worker.process.is_alive():
+                    reason = "worker exited"
+                elif oldest is not None and now - oldest > self.timeout * 2:
+                    # yt-dlp is stuck; unlike a thread, a process can be killed
+                    reason = "worker hung"
+                elif self._ping_worker(worker) is False:
+                    reason = "worker stopped answering pings"
+                if reason and not self._stopping.is_set():
+                    logger.warning("Extraction worker %s: %s, respawning", worker.index, reason)
+                    self._retire(worker, f"Extraction worker {worker.index}: {reason}")
+                    self._spawn(worker)
+                    self.respawns += 1
+
+    def _ping_worker(self, worker: _Worker) -> Optional[bool]:
+        """
+        Ping one specific worker if it is idle (bypassing load balancing).
+
+        The idle check, registering the ping and sending it happen under the
+        pool lock, so a request routed to the worker meanwhile is always sent
+        after the ping and cannot delay its answer.
+
+        Returns:
+            Whether the worker answered, or None if it was busy and not pinged
+        """
+        future: Future = Future()
+        request_id = next(self._ids)
+        try:
+            with self._lock:
+                if worker.pending:
+                    return None
+                worker.pending[request_id] = (future, time.monotonic(), 'ping')
+                with worker.send_lock:
+                    worker.conn.send((request_id, 'ping', ()))
+            future.result(timeout=PING_TIMEOUT)
+            return True
+        except Exception:
+            with self._lock:
+                worker.pending.pop(request_id, None)
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker liveness and request counters."""
+        with self._lock:
+            workers: List[Dict] = [
+                {'index': w.index, 'pid': w.process.pid if w.process else None,
+                 'alive': w.alive, 'pending': len(w.pending)}
+                for w in self._workers
+            ]
+        return {
+            'workers': workers,
+            'completed': self.completed,
+            'failed': self.failed,
+            'respawns': self.respawns
+        }
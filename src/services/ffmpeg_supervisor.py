@@ -0,0 +1,285 @@
+"""
+Supervisor that owns every FFmpeg child process (voice streams and audio cache downloads).
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, List
+import discord
+
+from src.config import Config
+from src.services.metrics import registry, PLAY_LATENCY, TRACK_GAP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# discord.py sends one 20 ms Opus packet per read()
+FRAME_SECONDS = 0.02
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    _CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = _PAGE_SIZE = None
+
+class SupervisedFFmpegOpusAudio(discord.FFmpegOpusAudio):
+    """FFmpegOpusAudio whose process is registered with the supervisor and whose position is tracked."""
+
+    def __init__(self, source: str, *, supervisor: 'FFmpegSupervisor', start_offset: float = 0.0, **kwargs):
+        self.supervisor = supervisor
+        self.start_offset = start_offset
+        self.frames = 0
+        self.process = None
+        # Monotonic timestamps used to measure latency up to the first packet:
+        # when the user asked for the track and when the previous track ended
+        self.created_at = time.monotonic()
+        self.requested_at: Optional[float] = None
+        self.previous_ended_at: Optional[float] = None
+        super().__init__(source, **kwargs)
+
+    def _spawn_process(self, args, **subprocess_kwargs):
+        process = super()._spawn_process(args, **subprocess_kwargs)
+        self.process = process
+        self.supervisor.register(self, process)
+        return process
+
+    def read(self) -> bytes:
+        data = super().read()
+        if data:
+            if not self.frames:
+                self._on_first_frame()
+            self.frames += 1
+        return data
+
+    def _on_first_frame(self) -> None:
+        now = time.monotonic()
+        if self.requested_at is not None:
+            # Only tracks started by /play; automatic advances show up in the track gap
+            PLAY_LATENCY.observe(now - self.created_at, stage='first_frame')
+            PLAY_LATENCY.observe(now - self.requested_at, stage='total')
+        if self.previous_ended_at is not None:
+            TRACK_GAP_SECONDS.observe(now - self.previous_ended_at)
+
+    @property
+    def position(self) -> float:
+        """Seconds into the track, including the offset the stream was started at."""
+        return self.start_offset + self.frames * FRAME_SECONDS
+
+    def cleanup(self) -> None:
+        self.supervisor.unregister(self)
+        super().cleanup()
+
+class _Child:
+    """Bookkeeping for one supervised FFmpeg process."""
+    __slots__ = ('source', 'process', 'started', 'cpu_ticks', 'sampled_at', 'cpu_percent', 'rss_bytes')
+
+    def __init__(self, source: Optional[SupervisedFFmpegOpusAudio], process):
+        self.source = source
+        self.process = process
+        self.started = time.monotonic()
+        self.cpu_ticks: Optional[int] = None
+        self.sampled_at = self.started
+        self.cpu_percent: Optional[float] = None
+        self.rss_bytes: Optional[int] = None
+
+class FFmpegSupervisor:
+    """
+    Caps, limits and monitors FFmpeg children across all guilds.
+
+    Sources must be created between acquire() and the source's cleanup(),
+    which releases the slot. Children get a nice level and an optional
+    address-space limit after spawning; a background task reaps exited
+    children and samples CPU and RSS from /proc.
+    """
+
+    def __init__(self, max_processes: int = Config.FFMPEG_MAX_PROCESSES,
+                 nice: int = Config.FFMPEG_NICE,
+                 memory_limit_mb: int = Config.FFMPEG_MEMORY_LIMIT_MB):
+        self.max_processes = max_processes
+        self.nice = nice
+        self.memory_limit_mb = memory_limit_mb
+        self._children: Dict[int, _Child] = {}
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.spawned = 0
+        self.reaped = 0
+        self.restarts = 0
+
+    async def acquire(self) -> None:
+        """Wait for a free FFmpeg slot (queues when the global cap is reached)."""
+        if self.max_processes <= 0:
+            return
+        if self._slots is None:
+            self._loop = asyncio.get_running_loop()
+            self._slots = asyncio.Semaphore(self.max_processes)
+        if self._slots.locked():
+            logger.info("FFmpeg process cap (%s) reached, waiting for a free slot", self.max_processes)
+        await self._slots.acquire()
+
+    def release(self) -> None:
+        """Give a slot back; safe to call from discord.py's audio thread."""
+        if self._slots is None or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._slots.release)
+
+    def register(self, source: Optional[SupervisedFFmpegOpusAudio], process) -> None:
+        """
+        Track a freshly spawned child and apply its resource limits.
+
+        Args:
+            source: Audio source reading the child, or None for children that
+                are not streaming to voice (audio cache downloads)
+            process: subprocess.Popen or asyncio subprocess of the child
+        """
+        self.apply_limits(process.pid)
+        with self._lock:
+            self._children[process.pid] = _Child(source, process)
+            self.spawned += 1
+
+    def unregister(self, source: SupervisedFFmpegOpusAudio) -> None:
+        """Stop tracking a source's child and release its slot (once)."""
+        if source.process is not None:
+            self.unregister_process(source.process)
+
+    def unregister_process(self, process) -> None:
+        """Stop tracking a child and release its slot (once)."""
+        with self._lock:
+            child = self._children.pop(process.pid, None)
+        if child is not None:
+            self.release()
+
+    def apply_limits(self, pid: int) -> None:
+        """Lower the child's priority and cap its address space."""
+        try:
+            if self.nice:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            if resource is not None and self.memory_limit_mb > 0 and hasattr(resource, 'prlimit'):
+                limit = self.memory_limit_mb * 1024 * 1024
+                resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+        except (AttributeError, OSError) as e:
+            logger.debug("Could not apply resource limits to FFmpeg pid %s: %s", pid, e)
+
+    def start(self, interval: float = Config.FFMPEG_MONITOR_INTERVAL) -> None:
+        """Start the background reaping and sampling task on the running loop."""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._monitor(interval))
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _monitor(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reap()
+                self.sample()
+            except Exception as e:
+                logger.error("FFmpeg supervisor check failed: %s", e)
+
+    def reap(self) -> int:
+        """Collect children that exited without their source being cleaned up."""
+        with self._lock:
+            exited = [pid for pid, child in self._children.items() if _has_exited(child.process)]
+            for pid in exited:
+                del self._children[pid]
+        for pid in exited:
+            self.release()
+        if exited:
+            self.reaped += len(exited)
+            logger.info("Reaped %s exited FFmpeg process(es)", len(exited))
+        return len(exited)
+
+    def sample(self) -> None:
+        """Refresh CPU and RSS figures for every child from /proc (Linux only)."""
+        if _CLOCK_TICKS is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            children = list(self._children.items())
+        for pid, child in children:
+            stat = _read_proc_stat(pid)
+            if stat is None:
+                continue
+            ticks, rss_pages = stat
+            if child.cpu_ticks is not None and now > child.sampled_at:
+                child.cpu_percent = (ticks - child.cpu_ticks) / _CLOCK_TICKS / (now - child.sampled_at) * 100
+            child.cpu_ticks = ticks
+            child.sampled_at = now
+            child.rss_bytes = rss_pages * _PAGE_SIZE
+
+    @property
+    def process_count(self) -> int:
+        return len(self._children)
+
+    def get_process_stats(self, source: SupervisedFFmpegOpusAudio) -> Optional[Dict]:
+        """Get CPU/RSS of the process behind a source, or None if it is not running."""
+        process = source.process
+        child = self._children.get(process.pid) if process is not None else None
+        return _describe(process.pid, child) if child is not None else None
+
+    def get_stats(self) -> Dict:
+        """Get per-process CPU/RSS and supervisor counters."""
+        with self._lock:
+            children = list(self._children.items())
+        processes: List[Dict] = [_describe(pid, child) for pid, child in children]
+        return {
+            'processes': processes,
+            'count': len(processes),
+            'max_processes': self.max_processes,
+            'cpu_percent': sum(p['cpu_percent'] or 0 for p in processes),
+            'rss_bytes': sum(p['rss_bytes'] or 0 for p in processes),
+            'spawned': self.spawned,
+            'reaped': self.reaped,
+            'restarts': self.restarts
+        }
+
+def _describe(pid: int, child: _Child) -> Dict:
+    return {
+        'pid': pid,
+        'uptime': time.monotonic() - child.started,
+        'position': child.source.position if child.source is not None else None,
+        'cpu_percent': child.cpu_percent,
+        'rss_bytes': child.rss_bytes
+    }
+
+def _has_exited(process) -> bool:
+    # Popen children (voice streams) are polled; asyncio children (cache
+    # downloads) have their return code set by the event loop
+    if hasattr(process, 'poll'):
+        return process.poll() is not None
+    return process.returncode is not None
+
+def _read_proc_stat(pid: int) -> Optional[tuple]:
+    """Read (utime + stime ticks, rss pages) for a process from /proc/<pid>/stat."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name is parenthesised and may contain spaces
+    fields = data[data.rindex(')') + 2:].split()
+    return int(fields[11]) + int(fields[12]), int(fields[21])
+
+# Global FFmpeg supervisor instance
+ffmpeg_supervisor = FFmpegSupervisor()
+
+registry.gauge('groove_deck_ffmpeg_processes', 'Running FFmpeg processes',
+               collect=lambda: ffmpeg_supervisor.process_count)
+registry.gauge('groove_deck_ffmpeg_cpu_percent', 'CPU used by all FFmpeg processes at the last sample',
+               collect=lambda: ffmpeg_supervisor.get_stats()['cpu_percent'])
+registry.gauge('groove_deck_ffmpeg_rss_bytes', 'Resident memory of all FFmpeg processes at the last sample',
+               collect=lambda: ffmpeg_supervisor.get_stats()['rss_bytes'])
+registry.counter('groove_deck_ffmpeg_restarts_total', 'Streams resumed after FFmpeg died mid-track',
+                 collect=lambda: ffmpeg_supervisor.restarts)
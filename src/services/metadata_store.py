@@ -0,0 +1,169 @@
+"""
+Persistent SQLite store for search and video metadata that survives restarts.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    duration INTEGER,
+    thumbnail TEXT,
+    uploader TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+class MetadataStore:
+    """Single-file store mapping normalized query -> video id and video id -> metadata."""
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Writes are buffered here and flushed in one transaction
+        self._pending_queries: Dict[str, str] = {}
+        self._pending_videos: Dict[str, Dict] = {}
+        self._last_flush = time.monotonic()
+
+    def open(self) -> None:
+        """Open (and create if needed) the database file."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        logger.info("Opened metadata store at %s", self.path)
+
+    def get_video(self, video_id: str) -> Optional[Dict]:
+        """
+        Look up stored metadata for a video.
+
+        Args:
+            video_id: YouTube video id
+
+        Returns:
+            Dictionary with video metadata or None if not stored
+        """
+        with self._lock:
+            pending = self._pending_videos.get(video_id)
+            if pending is not None:
+                return dict(pending)
+            if self._conn is None:
+                return None
+
+            row = self._conn.execute(
+                'SELECT video_id, title, url, duration, thumbnail, uploader FROM videos WHERE video_id = ?',
+                (video_id,)
+            ).fetchone()
+
+        return self._row_to_metadata(row) if row else None
+
+    def get_query(self, query: str) -> Optional[Dict]:
+        """
+        Look up the video a normalized search query previously resolved to.
+
+        Args:
+            query: Normalized search query
+
+        Returns:
+            Dictionary with video metadata or None if not stored
+        """
+        with self._lock:
+            video_id = self._pending_queries.get(query)
+            if video_id is None:
+                if self._conn is None:
+                    return None
+                row = self._conn.execute(
+                    'SELECT video_id FROM queries WHERE query = ?', (query,)
+                ).fetchone()
+                if not row:
+                    return None
+                video_id = row[0]
+
+        return self.get_video(video_id)
+
+    def put(self, query: Optional[str], metadata: Dict) -> None:
+        """Buffer a query and/or video record, flushing once the batch is full or stale."""
+        video_id = metadata.get('id')
+        if not video_id:
+            return
+
+        with self._lock:
+            self._pending_videos[video_id] = dict(metadata)
+            if query:
+                self._pending_queries[query] = video_id
+            pending = len(self._pending_videos) + len(self._pending_queries)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if pending >= self.batch_size or due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered records in a single transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if self._conn is None or not (self._pending_videos or self._pending_queries):
+                return
+
+            now = time.time()
+            videos = [
+                (video_id, m.get('title', 'Unknown Title'), m.get('url', ''), m.get('duration'),
+                 m.get('thumbnail', ''), m.get('uploader', 'Unknown'), now)
+                for video_id, m in self._pending_videos.items()
+            ]
+            queries = [(query, video_id, now) for query, video_id in self._pending_queries.items()]
+
+            try:
+                with self._conn:
+                    self._conn.executemany('INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?)', videos)
+                    self._conn.executemany('INSERT OR REPLACE INTO queries VALUES (?, ?, ?)', queries)
+            except sqlite3.Error as e:
+                logger.error("Failed to flush metadata store: %s", e)
+                return
+
+            self._pending_videos.clear()
+            self._pending_queries.clear()
+
+    def close(self) -> None:
+        """Flush buffered writes and close the database."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        logger.info("Closed metadata store at %s", self.path)
+
+    @staticmethod
+    def _row_to_metadata(row) -> Dict:
+        """Convert a videos row into the metadata dict returned by YouTubeService."""
+        video_id, title, url, duration, thumbnail, uploader = row
+        return {
+            'id': video_id,
+            'title': title,
+            'url': url,
+            'duration': duration,
+            'thumbnail': thumbnail,
+            'uploader': uploader,
+            'view_count': 0
+        }
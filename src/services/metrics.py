@@ -0,0 +1,242 @@
+"""
+Prometheus-style metrics for playback and extraction hot paths.
+
+Metrics are plain in-process counters, gauges and histograms guarded by a
+lock; recording one is a dict update. Values that already live elsewhere
+(cache statistics, queue lengths, FFmpeg usage) are read by collect
+callbacks only when the endpoint is scraped.
+"""
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple, Callable, Iterator, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+# A collect callback returns a single value, or values keyed by label values
+CollectResult = Union[float, Dict[LabelValues, float]]
+
+# Latency buckets (seconds) covering cache hits up to slow extractions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """Base class for a metric family with optional labels."""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], CollectResult]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _snapshot(self) -> Dict[LabelValues, float]:
+        if self._collect is not None:
+            result = self._collect()
+            return result if isinstance(result, dict) else {(): result}
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text exposition format."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, value in sorted(self._snapshot().items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}')
+        return lines
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(Metric):
+    """Value that can go up and down, either set directly or collected on scrape."""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        names = self.labelnames + ('le',)
+        for values, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(names, values + (_format_value(bound),))} {cumulative}')
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    """Holds metric families and serves them over HTTP for a local scraper."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, **kwargs))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                logger.error("Failed to collect metric %s: %s", metric.name, e)
+        return '\n'.join(lines) + '\n'
+
+    async def start_server(self, host: str, port: int) -> None:
+        """
+        Serve GET /metrics on host:port.
+
+        Args:
+            host: Interface to bind, normally 127.0.0.1 so only a local scraper can reach it
+            port: TCP port to listen on
+        """
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+
+    async def stop_server(self) -> None:
+        """Stop serving metrics."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain the headers; the request line is all that matters
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body, content_type = '200 OK', self.render().encode(), CONTENT_TYPE
+            else:
+                status, body, content_type = '404 Not Found', b'Not Found\n', 'text/plain'
+            writer.write(
+                f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+# Hot-path metrics recorded directly; collected gauges are registered next to the data they read
+PLAY_LATENCY = registry.histogram(
+    'groove_deck_play_latency_seconds',
+    '/play latency by stage: search, resolve, first_frame (source start to first packet) and total',
+    ('stage',)
+)
+EXTRACTION_SECONDS = registry.histogram(
+    'groove_deck_extraction_seconds',
+    'Time spent in yt-dlp extract_info by kind of lookup',
+    ('kind',)
+)
+TRACK_GAP_SECONDS = registry.histogram(
+    'groove_deck_track_gap_seconds',
+    'Silence between the end of one track and the first packet of the next'
+)
+TRACKS_STARTED = registry.counter(
+    'groove_deck_tracks_started_total',
+    'Tracks started by playback path',
+    ('path',)
+)
@@ -0,0 +1,135 @@
+"""
+Playback engine that builds Opus audio sources for Discord voice clients.
+"""
+import logging
+import shlex
+from typing import Optional, Dict, Tuple, Any
+import discord
+
+from src.audio_config.audio_config import DEFAULT_AUDIO_CONFIG
+from src.services.ffmpeg_supervisor import ffmpeg_supervisor, SupervisedFFmpegOpusAudio
+
+logger = logging.getLogger(__name__)
+
+# Keep long HTTP streams alive across transient network errors
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
+
+# Source is already Opus: FFmpeg only remuxes packets into Ogg (no decode/encode)
+PATH_PASSTHROUGH = 'passthrough'
+# Source needs decoding: FFmpeg encodes Opus itself, nothing is encoded in Python
+PATH_TRANSCODE = 'transcode'
+# Opus file from the disk audio cache, passed through like PATH_PASSTHROUGH
+PATH_CACHED = 'cached'
+
+# Opus sources up to this much above the preset bitrate are passed through as-is
+PASSTHROUGH_BITRATE_TOLERANCE = 1.25
+
+def parse_bitrate(bitrate: str) -> int:
+    """Convert a preset bitrate such as '128k' into kbps."""
+    return int(str(bitrate).lower().rstrip('k'))
+
+def preset_filters(preset: Dict[str, Any]) -> Optional[str]:
+    """Get the -af filter chain from a preset's FFmpeg options, if any."""
+    args = shlex.split(preset.get('ffmpeg_options', ''))
+    if '-af' in args:
+        index = args.index('-af')
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+class PlaybackEngine:
+    """Creates Opus audio sources, avoiding the PCM decode + Python Opus encode path."""
+
+    def __init__(self):
+        self.path_counts: Dict[str, int] = {PATH_PASSTHROUGH: 0, PATH_TRANSCODE: 0, PATH_CACHED: 0}
+
+    async def create_source(self, stream: Dict, preset: Optional[Dict[str, Any]] = None,
+                            start_offset: float = 0.0) -> Tuple[SupervisedFFmpegOpusAudio, str, int]:
+        """
+        Build an audio source for a resolved stream.
+
+        Waits for a free slot when the global FFmpeg process cap is reached;
+        the slot is released when the source is cleaned up.
+
+        Args:
+            stream: Stream info with 'url' and optionally 'acodec', 'abr' and 'local'
+                (set for files from the disk audio cache)
+            preset: AudioConfig preset supplying the bitrate and filters
+            start_offset: Seconds into the track to start from (used to resume a dead stream)
+
+        Returns:
+            Tuple of the audio source, the path it took (passthrough, cached or transcode)
+            and its outbound bitrate in kbps
+        """
+        preset = preset or DEFAULT_AUDIO_CONFIG
+        url = stream['url']
+        bitrate = parse_bitrate(preset['bitrate'])
+        filters = preset_filters(preset)
+
+        codec = stream.get('acodec')
+        source_bitrate = stream.get('abr')
+        if not codec or codec == 'none':
+            # yt-dlp did not report the codec, ask ffprobe instead
+            try:
+                codec, source_bitrate = await discord.FFmpegOpusAudio.probe(url)
+            except Exception as e:
+                logger.warning("Codec probe failed, transcoding: %s", e)
+                codec = None
+
+        local = bool(stream.get('local'))
+        # The reconnect options only apply to HTTP input
+        before_options = '' if local else FFMPEG_BEFORE_OPTIONS
+        if start_offset > 0:
+            # Input seeking: FFmpeg requests the stream from this point instead of decoding up to it
+            before_options = f'-ss {start_offset:.2f} {before_options}'.strip()
+
+        await ffmpeg_supervisor.acquire()
+        try:
+            if self._can_pass_through(codec, source_bitrate, bitrate, filters):
+                source = SupervisedFFmpegOpusAudio(
+                    url,
+                    supervisor=ffmpeg_supervisor,
+                    start_offset=start_offset,
+                    codec='opus',
+                    before_options=before_options,
+                    options='-vn'
+                )
+                path = PATH_CACHED if local else PATH_PASSTHROUGH
+                outbound = int(source_bitrate) if source_bitrate else bitrate
+            else:
+                options = '-vn'
+                if filters:
+                    options += f' -af {shlex.quote(filters)}'
+                source = SupervisedFFmpegOpusAudio(
+                    url,
+                    supervisor=ffmpeg_supervisor,
+                    start_offset=start_offset,
+                    bitrate=bitrate,
+                    before_options=before_options,
+                    options=options
+                )
+                path = PATH_TRANSCODE
+                outbound = bitrate
+        except Exception:
+            # The process never started, so cleanup() will not give the slot back
+            ffmpeg_supervisor.release()
+            raise
+
+        self.path_counts[path] += 1
+        logger.info("Stream using %s path (codec=%s, source=%sk, target=%sk)", path, codec, source_bitrate, bitrate)
+        return source, path, outbound
+
+    @staticmethod
+    def _can_pass_through(codec: Optional[str], source_bitrate: Optional[float],
+                          bitrate: int, filters: Optional[str]) -> bool:
+        """Check whether a stream can be sent to Discord without re-encoding."""
+        if codec not in ('opus', 'libopus') or filters:
+            return False
+        return not source_bitrate or source_bitrate <= bitrate * PASSTHROUGH_BITRATE_TOLERANCE
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get how many streams took each playback path."""
+        return dict(self.path_counts)
+
+# Global playback engine instance
+playback_engine = PlaybackEngine()
@@ -0,0 +1,295 @@
+"""
+Append-only journal of guild playback sessions, so queues survive restarts.
+
+Every snapshot interval the journal appends one JSON line per guild whose
+session changed: the whole session when its queue, track, channel or preset
+changed, otherwise only the position of the current track. The lines are
+collected on the event loop without touching the disk and written in one
+batch on a worker thread, so commands never wait for the journal. When
+reading, the last record of each guild wins. Once the file holds many times
+more records than there are live sessions it is rewritten with one record
+per session.
+
+Record keys:
+    g  guild id            c  voice channel id (null when not connected)
+    n  current track       q  queued tracks
+    p  position (seconds)  a  audio preset chosen with /audio_quality
+    x  set when the session ended
+Tracks are stored as [title, video_id, duration, requester_id].
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional, Dict, List, Any
+
+from src.config import Config
+from src.services.track import Track
+
+logger = logging.getLogger(__name__)
+
+# Rewrite the file once it holds this many records per live session (plus a fixed allowance)
+COMPACT_FACTOR = 20
+COMPACT_MIN_RECORDS = 1000
+# Voice connections opened at once while restoring sessions
+RESTORE_CONCURRENCY = 5
+
+def session_journal_path(path: str, worker_index: int = 0) -> str:
+    """Journal file of one shard worker: data/sessions.jsonl, data/sessions-1.jsonl, ..."""
+    if worker_index <= 0:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{worker_index}{ext}"
+
+def _pack(track: Optional[Track]) -> Optional[List]:
+    if track is None:
+        return None
+    return [track.title, track.video_id, track.duration, track.requester_id]
+
+def _unpack(fields: Optional[List]) -> Optional[Track]:
+    if not fields:
+        return None
+    title, video_id, duration, requester_id = fields
+    return Track(title=title, video_id=video_id, duration=duration, requester_id=requester_id)
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+
+class SessionJournal:
+    """
+    Periodic, incremental snapshots of AudioManager sessions in a JSON lines file.
+
+    open() loads the saved sessions, restore() brings them back once the bot
+    is connected, and start() begins journaling the live sessions.
+    """
+
+    def __init__(self, interval: float = Config.SESSION_SNAPSHOT_INTERVAL):
+        self.path: Optional[str] = None
+        self.interval = interval
+        # Sessions read from the file by open(), consumed by restore()
+        self.saved: Dict[int, Dict[str, Any]] = {}
+        # guild id -> (queue, queue version, current track, channel id, preset) last journaled
+        self._written: Dict[int, tuple] = {}
+        self._positions: Dict[int, float] = {}
+        self._records = 0
+        self._live = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def open(self, path: str) -> None:
+        """
+        Enable the journal and load the sessions saved in it.
+
+        Args:
+            path: Journal file, created on the first snapshot
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        saved: Dict[int, Dict[str, Any]] = {}
+        records = skipped = 0
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        guild_id = record.pop('g')
+                    except (ValueError, KeyError):
+                        # A torn final line from a crash mid-write
+                        skipped += 1
+                        continue
+                    records += 1
+                    if record.get('x'):
+                        saved.pop(guild_id, None)
+                    else:
+                        saved.setdefault(guild_id, {}).update(record)
+        except FileNotFoundError:
+            pass
+
+        self.path = path
+        self.saved = saved
+        self._records = records
+        logger.info("Session journal %s holds %s session(s) in %s record(s)%s",
+                    path, len(saved), records, f", skipped {skipped} unreadable" if skipped else "")
+
+    async def restore(self, manager, client) -> int:
+        """
+        Bring saved sessions back: presets, queues, voice connections and playback position.
+
+        Sessions of guilds this process does not serve (other shards) are
+        dropped. Playback resumes with FFmpeg seeking to the saved position.
+
+        Args:
+            manager: AudioManager to restore into
+            client: Connected discord client, used to look up guilds and channels
+
+        Returns:
+            Number of sessions restored
+        """
+        saved, self.saved = self.saved, {}
+        started = time.monotonic()
+        slots = asyncio.Semaphore(RESTORE_CONCURRENCY)
+
+        async def restore_one(guild_id: int, session: Dict[str, Any]) -> bool:
+            guild = client.get_guild(guild_id)
+            if guild is None:
+                return False
+            if session.get('a'):
+                manager.guild_presets[guild_id] = session['a']
+
+            current = _unpack(session.get('n'))
+            tracks = [_unpack(fields) for fields in session.get('q') or []]
+            if current is None and not tracks:
+                return True
+
+            player = manager.get_player(guild_id)
+            if player.current_track is not None or player.queue:
+                # Someone already started using this guild since the bot came up
+                return False
+            # The player is new and its task is not running, so the queue can be filled directly
+            for track in ([current] if current else []) + tracks:
+                player.add_track(track)
+
+            # Only sessions that were playing rejoin voice; idle queues just wait for /play
+            channel = guild.get_channel(session['c']) if current and session.get('c') else None
+            if channel is None:
+                return True
+            async with slots:
+                try:
+                    await player.connect(channel)
+                except Exception as e:
+                    logger.warning("Could not rejoin voice in guild %s: %s", guild_id, e)
+                    return True
+            await player.play(start_offset=float(session.get('p') or 0))
+            return True
+
+        results = await asyncio.gather(
+            *(restore_one(guild_id, session) for guild_id, session in saved.items()),
+            return_exceptions=True
+        )
+        restored = 0
+        for guild_id, result in zip(saved, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to restore session for guild %s: %s", guild_id, result)
+            elif result:
+                restored += 1
+        if saved:
+            logger.info("Restored %s of %s saved session(s) in %.1fs",
+                        restored, len(saved), time.monotonic() - started)
+        return restored
+
+    def start(self, manager) -> None:
+        """Start journaling the manager's sessions, beginning with a compacted snapshot."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._snapshot_forever(manager))
+
+    async def close(self, manager) -> None:
+        """Stop journaling after writing a final snapshot (call before players are torn down)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        try:
+            await self.snapshot(manager)
+        except Exception as e:
+            logger.error("Failed to write the final session snapshot: %s", e)
+
+    async def _snapshot_forever(self, manager) -> None:
+        # Rewrite right away: drops sessions that were not restored here
+        compact = True
+        while True:
+            try:
+                await self.snapshot(manager, compact=compact)
+            except Exception as e:
+                logger.error("Failed to write session snapshot: %s", e)
+            compact = False
+            await asyncio.sleep(self.interval)
+
+    async def snapshot(self, manager, compact: bool = False) -> int:
+        """
+        Journal what changed since the last snapshot.
+
+        Args:
+            manager: AudioManager whose sessions are journaled
+            compact: Rewrite the file with one record per live session
+
+        Returns:
+            Number of records written
+        """
+        async with self._lock:
+            compact = compact or self._records > self._live * COMPACT_FACTOR + COMPACT_MIN_RECORDS
+            if compact:
+                self._written.clear()
+                self._positions.clear()
+            lines = self._collect(manager)
+            if not lines and not compact:
+                return 0
+            data = ''.join(line + '\n' for line in lines)
+            if compact:
+                await asyncio.to_thread(self._rewrite, data)
+                self._records = len(lines)
+            else:
+                await asyncio.to_thread(self._append, data)
+                self._records += len(lines)
+            return len(lines)
+
+    def _collect(self, manager) -> List[str]:
+        """Build the records for every session that changed (runs on the loop, no I/O)."""
+        lines = []
+        live = set()
+        for guild_id in set(manager.players) | set(manager.guild_presets):
+            player = manager.players.get(guild_id)
+            queue = player.queue if player else None
+            current = player.current_track if player else None
+            preset = manager.guild_presets.get(guild_id)
+            if current is None and not queue and preset is None:
+                continue
+            live.add(guild_id)
+
+            voice_client = player.voice_client if player else None
+            channel_id = voice_client.channel.id if voice_client and voice_client.is_connected() else None
+            position = round(player.position, 1) if current else 0.0
+            signature = (queue, queue.version if queue is not None else None, current, channel_id, preset)
+            if self._written.get(guild_id) != signature:
+                lines.append(_dumps({
+                    'g': guild_id, 'c': channel_id, 'n': _pack(current),
+                    'q': [_pack(track) for track in queue] if queue else [],
+                    'p': position, 'a': preset
+                }))
+                self._written[guild_id] = signature
+            elif self._positions.get(guild_id) != position:
+                lines.append(_dumps({'g': guild_id, 'p': position}))
+            self._positions[guild_id] = position
+
+        for guild_id in list(self._written):
+            if guild_id not in live:
+                del self._written[guild_id]
+                self._positions.pop(guild_id, None)
+                lines.append(_dumps({'g': guild_id, 'x': 1}))
+        self._live = len(live)
+        return lines
+
+    def _append(self, data: str) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+    def _rewrite(self, data: str) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the journal's size and number of live sessions."""
+        return {'enabled': self.enabled, 'sessions': self._live, 'records': self._records}
+
+# Global session journal instance (enabled by open())
+session_journal = SessionJournal()
@@ -0,0 +1,93 @@
+"""
+Compact track records for music queues.
+"""
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Iterable, List
+
+YOUTUBE_WATCH_URL = 'https://www.youtube.com/watch?v='
+
+# Discord user ids are large ints, so every interaction produces a fresh int
+# object; sharing one object per requester keeps queued tracks small. Only
+# the most recent requesters are kept so one-off users do not accumulate
+MAX_INTERNED_REQUESTERS = 4096
+_requester_ids: 'OrderedDict[int, int]' = OrderedDict()
+
+def intern_requester(requester_id: Optional[int]) -> Optional[int]:
+    """Return a shared int object for a requester id (LRU-bounded)."""
+    if requester_id is None:
+        return None
+    shared = _requester_ids.get(requester_id)
+    if shared is None:
+        shared = _requester_ids[requester_id] = requester_id
+        if len(_requester_ids) > MAX_INTERNED_REQUESTERS:
+            _requester_ids.popitem(last=False)
+    else:
+        _requester_ids.move_to_end(requester_id)
+    return shared
+
+@dataclass(slots=True)
+class Track:
+    """
+    Represents a music track.
+
+    Stores the YouTube video id rather than the full URL; ``url`` rebuilds the
+    watch URL on demand. Sources without a video id keep their URL in
+    ``video_id`` and ``url`` returns it unchanged.
+    """
+    title: str
+    video_id: str
+    duration: Optional[int] = None
+    requester_id: Optional[int] = None
+
+    def __post_init__(self):
+        self.title = sys.intern(self.title)
+        self.requester_id = intern_requester(self.requester_id)
+
+    @property
+    def url(self) -> str:
+        """Watch URL of the track."""
+        if '/' in self.video_id:
+            return self.video_id
+        return YOUTUBE_WATCH_URL + self.video_id
+
+    @classmethod
+    def from_info(cls, info: Dict, requester_id: Optional[int] = None) -> 'Track':
+        """
+        Build a track from a yt-dlp info dict or YouTubeService metadata.
+
+        Args:
+            info: Dictionary with 'id' and/or 'url'/'webpage_url', 'title' and 'duration'
+            requester_id: Discord id of the user who queued the track
+
+        Returns:
+            New track
+        """
+        video_id = info.get('id') or info.get('webpage_url') or info.get('url', '')
+        duration = info.get('duration')
+        return cls(
+            title=info.get('title') or 'Unknown Title',
+            video_id=video_id,
+            duration=int(duration) if duration else None,
+            requester_id=requester_id
+        )
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict], requester_id: Optional[int] = None) -> List['Track']:
+        """
+        Build tracks in bulk, e.g. for playlist imports.
+
+        Args:
+            entries: yt-dlp entries or metadata dicts
+            requester_id: Discord id of the user who queued the tracks
+
+        Returns:
+            List of tracks, skipping entries without an id or URL
+        """
+        requester_id = intern_requester(requester_id)
+        return [
+            cls.from_info(entry, requester_id)
+            for entry in entries
+            if entry and (entry.get('id') or entry.get('webpage_url') or entry.get('url'))
+        ]
@@ -0,0 +1,131 @@
+"""
+Queue data structure for per-guild track lists.
+"""
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+from src.services.track import Track
+
+def track_key(track: Track) -> str:
+    """Identity of a track used for duplicate detection."""
+    return track.video_id
+
+class TrackQueue:
+    """
+    Deque-backed track queue.
+
+    Appends, head pops and length are O(1); positional removes and moves are
+    done in place on the deque. Positions are 0-based here, commands convert
+    from the 1-based positions users see.
+
+    `version` increases on every change, so views of the queue (such as
+    rendered /queue pages) can be cached until it moves. The total duration
+    is kept up to date on every add and remove instead of summed on demand.
+    """
+
+    def __init__(self):
+        self._items: Deque[Track] = deque()
+        # track key -> number of queued copies, for duplicate detection
+        self._counts: Dict[str, int] = {}
+        self.version = 0
+        # Seconds of all queued tracks with a known duration, and how many have none
+        self.total_duration = 0
+        self.unknown_durations = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Track]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> Track:
+        return self._items[index]
+
+    def append(self, track: Track) -> None:
+        """Add a track to the end of the queue."""
+        self._items.append(track)
+        self._index(track)
+
+    def appendleft(self, track: Track) -> None:
+        """Add a track to the head of the queue."""
+        self._items.appendleft(track)
+        self._index(track)
+
+    def popleft(self) -> Optional[Track]:
+        """Remove and return the head of the queue, or None if empty."""
+        if not self._items:
+            return None
+        track = self._items.popleft()
+        self._unindex(track)
+        return track
+
+    def remove_at(self, position: int) -> Optional[Track]:
+        """Remove and return the track at a position, or None if out of range."""
+        if not 0 <= position < len(self._items):
+            return None
+        if position == 0:
+            return self.popleft()
+        track = self._items[position]
+        del self._items[position]
+        self._unindex(track)
+        return track
+
+    def move(self, from_pos: int, to_pos: int) -> Optional[Track]:
+        """Move a track between positions, returning it or None if out of range."""
+        size = len(self._items)
+        if not (0 <= from_pos < size and 0 <= to_pos < size):
+            return None
+        track = self._items[from_pos]
+        del self._items[from_pos]
+        self._items.insert(to_pos, track)
+        self.version += 1
+        return track
+
+    def clear(self) -> None:
+        """Remove every track."""
+        self._items.clear()
+        self._counts.clear()
+        self.total_duration = 0
+        self.unknown_durations = 0
+        self.version += 1
+
+    def page(self, start: int, count: int) -> List[Track]:
+        """
+        Get up to count tracks from a 0-based position without copying the rest of the queue.
+
+        Each lookup walks the deque's 64-track blocks from the nearer end, so
+        the first and last pages are cheap and a page in the middle of a very
+        long queue costs a few block hops per track rather than a walk over
+        every track before it.
+        """
+        end = min(start + count, len(self._items))
+        return [self._items[index] for index in range(max(start, 0), end)]
+
+    def contains(self, track: Track) -> bool:
+        """Check whether a track with the same identity is already queued."""
+        return track_key(track) in self._counts
+
+    def _index(self, track: Track) -> None:
+        key = track_key(track)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if track.duration:
+            self.total_duration += track.duration
+        else:
+            self.unknown_durations += 1
+        self.version += 1
+
+    def _unindex(self, track: Track) -> None:
+        key = track_key(track)
+        remaining = self._counts.get(key, 0) - 1
+        if remaining > 0:
+            self._counts[key] = remaining
+        else:
+            self._counts.pop(key, None)
+        if track.duration:
+            self.total_duration -= track.duration
+        else:
+            self.unknown_durations -= 1
+        self.version += 1
@@ -1,19 +1,357 @@
 """
 YouTube service for searching and extracting audio URLs using yt-dlp.
 """
+import asyncio
+import contextvars
+import importlib
+import json
 import logging
-from typing import Optional, List, Dict
-import yt_dlp
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Callable, Any, Tuple, Iterator, AsyncIterator, TYPE_CHECKING
+from urllib.parse import urlparse, parse_qs
+
+from src.config import Config
+from src.audio_config.audio_config import AudioConfig
+from src.services.metadata_store import MetadataStore
+from src.services.metrics import registry, EXTRACTION_SECONDS
+from src.services.extraction_pool import ExtractionProcessPool
+from src.services.track import YOUTUBE_WATCH_URL
+
+if TYPE_CHECKING:
+    # Imported on first extraction instead: it is the slowest import of the bot
+    import yt_dlp
 
 logger = logging.getLogger(__name__)
 
+# googlevideo stream URLs carry their expiry either as ?expire=<ts> or /expire/<ts>/
+_EXPIRE_PATH_RE = re.compile(r'/expire/(\d+)')
+
+# Stream URLs are dropped this many seconds before YouTube stops honouring them
+STREAM_EXPIRY_MARGIN = 60
+
+# Search words that look like a video id but are not one skip the id lookup this long
+MISSING_VIDEO_TTL = 600
+
+# watch?v=, shorts/, embed/, live/ and youtu.be/ links, plus bare 11 character ids
+_VIDEO_URL_RE = re.compile(
+    r'^(?:https?://)?(?:(?:www|m|music)\.)?'
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)'
+    r'(?P<id>[A-Za-z0-9_-]{11})(?:[?&#/].*)?$'
+)
+_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+def parse_video_id(query: str) -> Optional[str]:
+    """
+    Extract the video id from a YouTube link or bare video id.
+    
+    Args:
+        query: User input from /play
+        
+    Returns:
+        The 11 character video id, or None if the input is a search query
+    """
+    query = query.strip()
+    if _VIDEO_ID_RE.match(query):
+        return query
+    match = _VIDEO_URL_RE.match(query)
+    return match.group('id') if match else None
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry."""
+    return ' '.join(query.lower().split())
+
+def stream_url_expiry(url: str) -> Optional[float]:
+    """
+    Get the expiry timestamp embedded in a googlevideo stream URL.
+    
+    Args:
+        url: Direct stream URL returned by yt-dlp
+        
+    Returns:
+        Unix timestamp the URL expires at, or None if it carries no expiry
+    """
+    parsed = urlparse(url)
+    expire = parse_qs(parsed.query).get('expire')
+    if expire:
+        value = expire[0]
+    else:
+        match = _EXPIRE_PATH_RE.search(parsed.path)
+        if not match:
+            return None
+        value = match.group(1)
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _estimate_size(value: Any) -> int:
+    """Roughly estimate the memory held by a cached value."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return size
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry and an approximate memory cap."""
+    
+    def __init__(self, name: str, max_entries: int, max_bytes: int, default_ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry, marking it as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+                
+            value, expires_at, size = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.misses += 1
+                return None
+                
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+            
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry, evicting least recently used entries to stay within the caps."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+            
+        size = sys.getsizeof(key) + _estimate_size(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+                
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+                
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+class YoutubeDLPool:
+    """
+    Long-lived YoutubeDL instances, one per extraction thread and option set.
+    
+    Building a YoutubeDL loads every extractor and sets up cookie jars and HTTP
+    handlers; reusing instances keeps that work (and keep-alive connections)
+    across calls. YoutubeDL is not thread-safe, so instances are thread-local.
+    Instances are recycled after a number of uses or an age limit to bound
+    memory growth from per-instance caches.
+    """
+    
+    def __init__(self, max_uses: int = Config.YTDL_RECYCLE_USES,
+                 max_age: float = Config.YTDL_RECYCLE_SECONDS):
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        
+    @contextmanager
+    def acquire(self, ydl_opts: Dict) -> Iterator['yt_dlp.YoutubeDL']:
+        """Borrow this thread's YoutubeDL for an option set, creating it if needed."""
+        key = json.dumps(ydl_opts, sort_keys=True, default=str)
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = {}
+            
+        entry = instances.get(key)
+        if entry is not None and (entry[2] >= self.max_uses or time.monotonic() - entry[1] >= self.max_age):
+            self._close(instances.pop(key)[0])
+            entry = None
+            with self._lock:
+                self.recycled += 1
+                
+        if entry is None:
+            import yt_dlp
+            entry = [yt_dlp.YoutubeDL(ydl_opts), time.monotonic(), 0]
+            instances[key] = entry
+            with self._lock:
+                self.created += 1
+        else:
+            with self._lock:
+                self.reused += 1
+                
+        entry[2] += 1
+        try:
+            yield entry[0]
+        except Exception:
+            # Don't reuse an instance whose extractor state may be inconsistent
+            if instances.get(key) is entry:
+                self._close(instances.pop(key)[0])
+            raise
+            
+    @staticmethod
+    def _close(ydl: 'yt_dlp.YoutubeDL') -> None:
+        """Release an instance's cookies and HTTP connections."""
+        try:
+            ydl.close()
+        except Exception as e:
+            logger.debug("Error closing YoutubeDL instance: %s", e)
+            
+    def stats(self) -> Dict[str, int]:
+        """Get instance creation and reuse counters."""
+        with self._lock:
+            return {'created': self.created, 'reused': self.reused, 'recycled': self.recycled}
+
+def _video_metadata(info: Dict, default_url: str = '') -> Dict:
+    """Trim a yt-dlp info dict down to the metadata the bot keeps."""
+    return {
+        'id': info.get('id'),
+        'title': info.get('title', 'Unknown Title'),
+        'url': info.get('webpage_url', default_url),
+        'duration': info.get('duration'),
+        'thumbnail': info.get('thumbnail', ''),
+        'uploader': info.get('uploader', 'Unknown'),
+        'view_count': info.get('view_count', 0)
+    }
+
+def _stream_info(info: Dict) -> Optional[Dict]:
+    """Get the direct stream URL and codec details from a yt-dlp info dict."""
+    if 'url' not in info:
+        return None
+    return {'url': info['url'], 'acodec': info.get('acodec'), 'abr': info.get('abr')}
+
+# Extractors run yt-dlp and return only small, picklable results, so they can
+# run on the extraction threads or in the worker processes unchanged
+
+def extract_search(ydl_pool: 'YoutubeDLPool', ydl_opts: Dict, query: str) -> Optional[Dict]:
+    """Metadata of the first ytsearch result for a query."""
+    with ydl_pool.acquire(ydl_opts) as ydl:
+        info = ydl.extract_info(f"ytsearch:{query}", download=False)
+    if info and info.get('entries'):
+        return _video_metadata(info['entries'][0])
+    return None
+
+def extract_video(ydl_pool: 'YoutubeDLPool', ydl_opts: Dict,
+                  video_url: str) -> Optional[Tuple[Dict, Optional[Dict]]]:
+    """Metadata and (default format) stream info of a single video."""
+    with ydl_pool.acquire(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+    if not info:
+        return None
+    metadata = _video_metadata(info, video_url)
+    metadata['id'] = metadata['id'] or parse_video_id(video_url)
+    return metadata, _stream_info(info)
+
+def extract_stream(ydl_pool: 'YoutubeDLPool', ydl_opts: Dict, video_url: str,
+                   audio_format: Optional[str] = None) -> Optional[Dict]:
+    """Stream info of a video in the given (or default) format."""
+    if audio_format:
+        ydl_opts = {**ydl_opts, 'format': audio_format}
+    with ydl_pool.acquire(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+    return _stream_info(info) if info else None
+
+EXTRACTORS: Dict[str, Callable[..., Any]] = {
+    'search': extract_search,
+    'video': extract_video,
+    'stream': extract_stream
+}
+
 class YouTubeService:
     """Service for YouTube operations using yt-dlp."""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = Config.EXTRACTION_WORKERS,
+                 max_concurrency: int = Config.EXTRACTION_CONCURRENCY,
+                 timeout: float = Config.EXTRACTION_TIMEOUT):
+        # yt-dlp is fully blocking, so extractions run on a bounded thread pool
+        # and are awaited from the event loop via search()/resolve()
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='yt-dlp'
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # A playlist holds its thread until the last page is read, so playlists get
+        # their own small pool and never take the threads searches and streams need
+        self._playlist_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.PLAYLIST_WORKERS),
+            thread_name_prefix='yt-dlp-playlist'
+        )
+        
+        # In-flight extractions by lookup key, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.flights = 0
+        self.coalesced = 0
+        
+        # normalized query -> video metadata, video URL -> direct stream URL
+        self.search_cache = TTLCache(
+            'search', Config.CACHE_MAX_ENTRIES, Config.CACHE_MAX_BYTES, Config.SEARCH_CACHE_TTL
+        )
+        self.stream_cache = TTLCache(
+            'stream', Config.CACHE_MAX_ENTRIES, Config.CACHE_MAX_BYTES, Config.STREAM_CACHE_TTL
+        )
+        # 11 character queries that turned out not to be video ids
+        self.missing_videos = TTLCache(
+            'missing', Config.CACHE_MAX_ENTRIES, Config.CACHE_MAX_BYTES // 16, MISSING_VIDEO_TTL
+        )
+        
+        # Reused YoutubeDL instances for the extraction threads
+        self.ydl_pool = YoutubeDLPool()
+        
+        # Optional out-of-process extraction workers, started via start_process_pool()
+        self.process_pool: Optional[ExtractionProcessPool] = None
+        
+        # Optional on-disk metadata store, opened at startup via open_store()
+        self.store: Optional[MetadataStore] = None
+        
         # Configure yt-dlp options for audio extraction with Discord compatibility
         self.ydl_opts = {
-            'format': 'bestaudio/best',  # Use best available audio
+            # Use the default preset's format (which prefers Opus for passthrough)
+            # so streams resolved alongside metadata match what playback requests
+            'format': AudioConfig.get_preset(Config.DEFAULT_AUDIO_PRESET)['yt_dlp_format'],
             'extractaudio': True,
             'audioformat': 'mp3',  # Use MP3 for better Discord compatibility
             'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
@@ -45,28 +383,184 @@ class YouTubeService:
         Returns:
             Dictionary with video metadata or None if not found
         """
+        # Links skip the ytsearch round-trip entirely
+        video_id = parse_video_id(query)
+        bare_id = video_id is not None and _VIDEO_ID_RE.match(query.strip()) is not None
+        if video_id and not bare_id:
+            return self.get_video(video_id)
+            
+        cache_key = normalize_query(query)
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+            
+        if self.store:
+            stored = self.store.get_query(cache_key)
+            if stored is not None:
+                self.search_cache.set(cache_key, stored)
+                return dict(stored)
+                
+        # A single 11 character word may be an id or a search ("Unstoppable");
+        # try it as an id unless that recently failed, then fall through to a search
+        if bare_id and self.missing_videos.get(video_id) is None:
+            metadata = self.get_video(video_id, quiet=True)
+            if metadata is not None:
+                return metadata
+            self.missing_videos.set(video_id, True)
+            
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                # Try to extract info from the query
-                info = ydl.extract_info(f"ytsearch:{query}", download=False)
+            metadata = self._extract('search', query)
+        except Exception as e:
+            logger.error("Error searching for video '%s': %s", query, e)
+            return None
+            
+        if metadata is None:
+            return None
+            
+        self.search_cache.set(cache_key, metadata)
+        if metadata['id']:
+            self.search_cache.set(f"id:{metadata['id']}", metadata)
+        if self.store:
+            self.store.put(cache_key, metadata)
+        return dict(metadata)
+        
+    def get_video(self, video_id: str, quiet: bool = False) -> Optional[Dict]:
+        """
+        Get metadata for a video id, extracting it directly only on a cache miss.
+        
+        The direct extraction also yields the stream URL, which is cached so
+        starting playback does not need a second extraction.
+        
+        Args:
+            video_id: YouTube video id
+            quiet: Log a failed extraction at debug level (the id was only a guess)
+            
+        Returns:
+            Dictionary with video metadata or None if not found
+        """
+        cache_key = f"id:{video_id}"
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+            
+        if self.store:
+            stored = self.store.get_video(video_id)
+            if stored is not None:
+                self.search_cache.set(cache_key, stored)
+                return dict(stored)
                 
-                if info and 'entries' in info and info['entries']:
-                    video_info = info['entries'][0]
-                    return {
-                        'title': video_info.get('title', 'Unknown Title'),
-                        'url': video_info.get('webpage_url', ''),
-                        'duration': video_info.get('duration'),
-                        'thumbnail': video_info.get('thumbnail', ''),
-                        'uploader': video_info.get('uploader', 'Unknown'),
-                        'view_count': video_info.get('view_count', 0)
-                    }
-                    
+        video_url = YOUTUBE_WATCH_URL + video_id
+        try:
+            result = self._extract('video', video_url)
         except Exception as e:
-            logger.error(f"Error searching for video '{query}': {e}")
+            logger.log(logging.DEBUG if quiet else logging.ERROR, "Error extracting video '%s': %s", video_id, e)
             return None
             
-        return None
+        if result is None:
+            return None
+            
+        metadata, stream = result
+        self.search_cache.set(cache_key, metadata)
+        if self.store:
+            self.store.put(None, metadata)
+            
+        if stream is not None:
+            self.stream_cache.set(
+                self._stream_cache_key(video_url, None), stream, ttl=self._stream_ttl(stream['url'])
+            )
+            
+        return dict(metadata)
+        
+    def iter_playlist(self, playlist_url: str) -> Iterator[Dict]:
+        """
+        Enumerate playlist entries lazily using flat extraction.
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            
+        Yields:
+            Dictionaries with 'id', 'title', 'url' and 'duration' for each entry
+        """
+        ydl_opts = {
+            **self.ydl_opts,
+            'noplaylist': False,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True
+        }
+        
+        with self.ydl_pool.acquire(ydl_opts) as ydl:
+            # process=False keeps 'entries' as a generator that fetches pages on demand
+            with EXTRACTION_SECONDS.time(kind='playlist'):
+                info = ydl.extract_info(playlist_url, download=False, process=False)
+            if not info:
+                return
+                
+            entries = info.get('entries')
+            if entries is None:
+                entries = [info]
+                
+            for entry in entries:
+                if not entry or not entry.get('id'):
+                    continue
+                metadata = {
+                    'id': entry['id'],
+                    'title': entry.get('title') or 'Unknown Title',
+                    'url': entry.get('url') or entry.get('webpage_url', ''),
+                    'duration': entry.get('duration'),
+                    'thumbnail': entry.get('thumbnail', ''),
+                    'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown',
+                    'view_count': entry.get('view_count') or 0
+                }
+                if self.store:
+                    self.store.put(None, metadata)
+                yield metadata
+                
+    async def stream_playlist(self, playlist_url: str,
+                              limit: int = Config.PLAYLIST_MAX_TRACKS) -> AsyncIterator[List[Dict]]:
+        """
+        Stream playlist entries to the event loop as the extractor produces them.
+        
+        Entries are handed over in batches of whatever arrived since the
+        caller last asked (usually a whole page), never waiting to fill one.
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            limit: Maximum number of entries to produce
+            
+        Yields:
+            Non-empty lists of entry metadata dictionaries, in playlist order
+        """
+        loop = asyncio.get_running_loop()
+        entries: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        cancelled = threading.Event()
         
+        def produce():
+            try:
+                for count, entry in enumerate(self.iter_playlist(playlist_url)):
+                    if cancelled.is_set() or count >= limit:
+                        break
+                    loop.call_soon_threadsafe(entries.put_nowait, entry)
+            except Exception as e:
+                logger.error("Error enumerating playlist '%s': %s", playlist_url, e)
+            finally:
+                loop.call_soon_threadsafe(entries.put_nowait, finished)
+                
+        loop.run_in_executor(self._playlist_executor, produce)
+        try:
+            done = False
+            while not done:
+                batch = [await entries.get()]
+                while not entries.empty():
+                    batch.append(entries.get_nowait())
+                if batch[-1] is finished:
+                    batch.pop()
+                    done = True
+                if batch:
+                    yield batch
+        finally:
+            cancelled.set()
+            
     def get_audio_url(self, video_url: str) -> Optional[str]:
         """
         Extract the direct audio URL from a YouTube video URL.
@@ -77,18 +571,212 @@ class YouTubeService:
         Returns:
             Direct audio URL or None if extraction fails
         """
+        stream = self.get_stream_info(video_url)
+        return stream['url'] if stream else None
+        
+    def get_stream_info(self, video_url: str, audio_format: Optional[str] = None) -> Optional[Dict]:
+        """
+        Extract the direct audio URL and its codec details from a YouTube video URL.
+        
+        Args:
+            video_url: YouTube video URL
+            audio_format: yt-dlp format selector overriding the default
+            
+        Returns:
+            Dictionary with 'url', 'acodec' and 'abr' or None if extraction fails
+        """
+        cache_key = self._stream_cache_key(video_url, audio_format)
+        cached = self.stream_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+            
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                
-                if info and 'url' in info:
-                    return info['url']
-                    
+            stream = self._extract('stream', video_url, audio_format)
         except Exception as e:
-            logger.error(f"Error extracting audio URL from '{video_url}': {e}")
+            logger.error("Error extracting audio URL from '%s': %s", video_url, e)
             return None
             
-        return None
+        if stream is None:
+            return None
+            
+        self.stream_cache.set(cache_key, stream, ttl=self._stream_ttl(stream['url']))
+        return dict(stream)
+        
+    def _extract(self, kind: str, *args) -> Any:
+        """
+        Run one yt-dlp extraction, in the worker processes when they are running.
+        
+        Args:
+            kind: Extractor name ('search', 'video' or 'stream')
+            *args: Extractor arguments
+            
+        Returns:
+            The extractor's trimmed result
+        """
+        with EXTRACTION_SECONDS.time(kind=kind):
+            if self.process_pool is not None:
+                return self.process_pool.call(kind, *args)
+            return EXTRACTORS[kind](self.ydl_pool, self.ydl_opts, *args)
+        
+    async def search(self, query: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Search for a video without blocking the event loop.
+        
+        Args:
+            query: Search query (song name, artist, or URL)
+            timeout: Seconds to wait before giving up (defaults to the service timeout)
+            
+        Returns:
+            Dictionary with video metadata or None if not found or timed out
+        """
+        video_id = parse_video_id(query)
+        key = f"id:{video_id}" if video_id else f"search:{normalize_query(query)}"
+        return await self._single_flight(key, self.search_video, query, timeout=timeout)
+        
+    async def resolve(self, video_url: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Resolve the direct audio URL for a video without blocking the event loop.
+        
+        Args:
+            video_url: YouTube video URL
+            timeout: Seconds to wait before giving up (defaults to the service timeout)
+            
+        Returns:
+            Direct audio URL or None if extraction fails or timed out
+        """
+        stream = await self.resolve_stream(video_url, timeout=timeout)
+        return stream['url'] if stream else None
+        
+    async def resolve_stream(self, video_url: str, audio_format: Optional[str] = None,
+                             timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Resolve the direct audio URL and codec details without blocking the event loop.
+        
+        Args:
+            video_url: YouTube video URL
+            audio_format: yt-dlp format selector overriding the default
+            timeout: Seconds to wait before giving up (defaults to the service timeout)
+            
+        Returns:
+            Dictionary with 'url', 'acodec' and 'abr' or None if extraction fails or timed out
+        """
+        key = f"stream:{self._stream_cache_key(video_url, audio_format)}"
+        return await self._single_flight(key, self.get_stream_info, video_url, audio_format, timeout=timeout)
+        
+    async def _single_flight(self, key: str, func: Callable[..., Any], *args,
+                             timeout: Optional[float] = None) -> Any:
+        """
+        Run an extraction once for all concurrent callers with the same key.
+        
+        The first caller starts the extraction; callers arriving while it is in
+        flight await the same task instead of starting their own.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_blocking(func, *args, timeout=timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.flights += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced concurrent lookup for %s", key)
+            
+        # Shield so one caller cancelling (e.g. a dropped prefetch) doesn't cancel the others
+        result = await asyncio.shield(task)
+        return dict(result) if isinstance(result, dict) else result
+        
+    async def _run_blocking(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Run a blocking extraction on the thread pool, bounded by the concurrency limit."""
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        
+        async with self._semaphore:
+            # Carry the caller's log context (guild) into the worker thread
+            context = contextvars.copy_context()
+            future = loop.run_in_executor(self._executor, context.run, func, *args)
+            try:
+                return await asyncio.wait_for(future, timeout=timeout)
+            except asyncio.TimeoutError:
+                # The worker thread cannot be interrupted; it finishes in the
+                # background and its result is discarded
+                logger.warning("yt-dlp extraction %s%s timed out after %ss", func.__name__, args, timeout)
+                return None
+                
+    def forget_stream(self, video_url: str, audio_format: Optional[str] = None) -> None:
+        """Drop a cached stream URL so the next resolve extracts a fresh one."""
+        self.stream_cache.delete(self._stream_cache_key(video_url, audio_format))
+        
+    def _stream_cache_key(self, video_url: str, audio_format: Optional[str]) -> str:
+        """Cache key for a stream resolved with a given (or the default) format."""
+        return f"{audio_format or self.ydl_opts['format']}|{video_url}"
+        
+    def _stream_ttl(self, audio_url: str) -> float:
+        """Get how long a resolved stream URL may be served from the cache."""
+        expires_at = stream_url_expiry(audio_url)
+        if expires_at is None:
+            return self.stream_cache.default_ttl
+        return expires_at - time.time() - STREAM_EXPIRY_MARGIN
+        
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Get how many async lookups ran an extraction vs joined one already in flight."""
+        return {
+            'flights': self.flights,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight)
+        }
+        
+    def open_store(self, path: str) -> None:
+        """
+        Open the persistent metadata store so searches survive restarts.
+        
+        Args:
+            path: Path of the SQLite database file
+        """
+        store = MetadataStore(path)
+        store.open()
+        self.store = store
+        
+    def close_store(self) -> None:
+        """Flush and close the persistent metadata store, if open."""
+        if self.store:
+            self.store.close()
+            self.store = None
+            
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Get hit/miss counters for the search and stream URL caches."""
+        return {
+            'search': self.search_cache.stats(),
+            'stream': self.stream_cache.stats()
+        }
+        
+    def start_process_pool(self, processes: int = Config.EXTRACTION_PROCESSES) -> None:
+        """
+        Move yt-dlp extraction into worker processes.
+        
+        The caches, single-flight coalescing and timeouts stay in this process;
+        only extract_info and the trimming of its result run in the workers.
+        Playlist enumeration keeps running on the extraction threads.
+        
+        Args:
+            processes: Number of worker processes
+        """
+        if self.process_pool is None and processes > 0:
+            pool = ExtractionProcessPool(self.ydl_opts, processes=processes)
+            pool.start()
+            self.process_pool = pool
+            
+    def warm_up(self) -> None:
+        """Import yt-dlp on an extraction thread, off the startup path but before the first /play."""
+        if self.process_pool is None:
+            self._executor.submit(importlib.import_module, 'yt_dlp')
+            
+    def shutdown(self) -> None:
+        """Stop the extraction thread pool and worker processes."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._playlist_executor.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.stop()
+            self.process_pool = None
         
     def validate_url(self, url: str) -> bool:
         """
@@ -102,6 +790,42 @@ class YouTubeService:
         """
         youtube_domains = ['youtube.com', 'youtu.be', 'www.youtube.com']
         return any(domain in url.lower() for domain in youtube_domains)
+        
+    def is_playlist_url(self, url: str) -> bool:
+        """
+        Check if a URL points at a YouTube playlist.
+        
+        Video links that also carry a playlist (watch?v=ID&list=RD... mixes,
+        youtu.be/ID?list=...) play just the video.
+        
+        Args:
+            url: URL to check
+            
+        Returns:
+            True for /playlist links and list= links without a video, False otherwise
+        """
+        if not self.validate_url(url):
+            return False
+        parsed = urlparse(url.strip())
+        if parsed.path.rstrip('/') == '/playlist':
+            return True
+        return 'list' in parse_qs(parsed.query) and parse_video_id(url) is None
 
 # Global YouTube service instance
 youtube_service = YouTubeService()
+
+def _cache_counter(field: str) -> Dict[Tuple[str], float]:
+    return {(name,): stats[field] for name, stats in youtube_service.get_cache_stats().items()}
+
+registry.counter('groove_deck_cache_hits_total', 'Extraction cache hits', ('cache',),
+                 collect=lambda: _cache_counter('hits'))
+registry.counter('groove_deck_cache_misses_total', 'Extraction cache misses', ('cache',),
+                 collect=lambda: _cache_counter('misses'))
+registry.gauge('groove_deck_cache_entries', 'Entries held by each extraction cache', ('cache',),
+               collect=lambda: _cache_counter('entries'))
+registry.counter('groove_deck_extractions_coalesced_total',
+                 'Async lookups that joined an extraction already in flight',
+                 collect=lambda: youtube_service.coalesced)
+registry.counter('groove_deck_extraction_worker_respawns_total',
+                 'Extraction worker processes replaced after dying or hanging',
+                 collect=lambda: youtube_service.process_pool.respawns if youtube_service.process_pool else 0)
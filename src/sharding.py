@@ -0,0 +1,181 @@
+"""
+Multi-process sharding supervisor for Groove Deck.
+
+The supervisor does not connect to Discord itself. It splits the shards into
+contiguous ranges, starts one worker process per range (main.py with
+SHARD_IDS/SHARD_COUNT set) and restarts workers that exit. Every worker is a
+complete bot with its own AudioManager, so a guild's playback state lives
+only in the process that owns its shard.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import urllib.request
+from typing import List, Optional, Dict
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Discord allows one IDENTIFY per 5 seconds per bucket; workers are staggered accordingly
+IDENTIFY_INTERVAL = 5.0
+
+# Restart backoff for crashing workers (doubles per consecutive crash)
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+# A worker that ran this long is considered healthy again and its backoff resets
+STABLE_UPTIME = 300.0
+
+GATEWAY_BOT_URL = 'https://discord.com/api/v10/gateway/bot'
+
+def assign_shards(shard_count: int, processes: int) -> List[List[int]]:
+    """
+    Split shard ids into contiguous, evenly sized ranges.
+
+    Args:
+        shard_count: Total number of shards
+        processes: Number of worker processes (capped at shard_count)
+
+    Returns:
+        One list of shard ids per worker
+    """
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def fetch_recommended_shards(token: str) -> int:
+    """Ask Discord how many shards the bot should run."""
+    request = urllib.request.Request(GATEWAY_BOT_URL, headers={
+        'Authorization': f'Bot {token}',
+        'User-Agent': 'DiscordBot (groove-deck, 1.0)'
+    })
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return int(json.load(response)['shards'])
+
+class ShardWorker:
+    """One worker process running a range of shards."""
+
+    def __init__(self, index: int, shard_ids: List[int], shard_count: int):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = RESTART_BACKOFF_MIN
+
+    @property
+    def name(self) -> str:
+        return f"worker {self.index} (shards {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+    async def start(self) -> None:
+        """Spawn the worker process."""
+        env = {
+            **os.environ,
+            'SHARD_IDS': ','.join(map(str, self.shard_ids)),
+            'SHARD_COUNT': str(self.shard_count),
+            'WORKER_INDEX': str(self.index)
+        }
+        main_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+        self.process = await asyncio.create_subprocess_exec(sys.executable, main_script, env=env)
+        self.started_at = time.monotonic()
+        logger.info("Started %s as pid %s", self.name, self.process.pid)
+
+class ShardSupervisor:
+    """Spawns shard workers, restarts crashed ones and stops them all on shutdown."""
+
+    def __init__(self, shard_count: int, processes: int):
+        self.workers = [
+            ShardWorker(index, shard_ids, shard_count)
+            for index, shard_ids in enumerate(assign_shards(shard_count, processes))
+        ]
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Run until a termination signal, keeping every worker alive."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+
+        tasks = []
+        delay = 0.0
+        try:
+            for worker in self.workers:
+                # Start the next worker once the previous one had time to identify its shards
+                tasks.append(asyncio.create_task(self._keep_alive(worker, delay)))
+                delay += IDENTIFY_INTERVAL * len(worker.shard_ids)
+            await self._stopping.wait()
+        finally:
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._stop_workers()
+
+    async def _keep_alive(self, worker: ShardWorker, delay: float) -> None:
+        """Start a worker and restart it with backoff whenever it exits."""
+        await asyncio.sleep(delay)
+        while not self._stopping.is_set():
+            await worker.start()
+            code = await worker.process.wait()
+            if self._stopping.is_set():
+                return
+
+            uptime = time.monotonic() - worker.started_at
+            if uptime >= STABLE_UPTIME:
+                worker.backoff = RESTART_BACKOFF_MIN
+            worker.restarts += 1
+            logger.error("%s exited with code %s after %.0fs, restarting in %.1fs",
+                         worker.name, code, uptime, worker.backoff)
+            await asyncio.sleep(worker.backoff)
+            worker.backoff = min(worker.backoff * 2, RESTART_BACKOFF_MAX)
+
+    async def _stop_workers(self, timeout: float = 15.0) -> None:
+        """Ask workers to shut down, killing any that do not exit in time."""
+        running = [w for w in self.workers if w.process is not None and w.process.returncode is None]
+        for worker in running:
+            worker.process.terminate()
+        for worker in running:
+            try:
+                await asyncio.wait_for(worker.process.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%s did not stop in %.0fs, killing it", worker.name, timeout)
+                worker.process.kill()
+                await worker.process.wait()
+        logger.info("All shard workers stopped")
+
+    def get_stats(self) -> List[Dict]:
+        """Get the state of every worker."""
+        return [
+            {
+                'index': worker.index,
+                'shard_ids': worker.shard_ids,
+                'pid': worker.process.pid if worker.process else None,
+                'running': worker.process is not None and worker.process.returncode is None,
+                'restarts': worker.restarts
+            }
+            for worker in self.workers
+        ]
+
+async def supervise() -> None:
+    """Entry point of the sharding supervisor."""
+    shard_count = Config.SHARD_COUNT
+    if shard_count <= 0:
+        shard_count = await asyncio.to_thread(fetch_recommended_shards, Config.DISCORD_TOKEN)
+        logger.info("Discord recommends %s shard(s)", shard_count)
+    supervisor = ShardSupervisor(shard_count, Config.SHARD_PROCESSES)
+    logger.info("Running %s shard(s) across %s worker process(es)", shard_count, len(supervisor.workers))
+    await supervisor.run()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-guild player's command inbox: queue edits and skip coalescing.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+pytest.importorskip('discord')
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services import audio_player as audio_player_module
+from src.services.audio_player import AudioPlayer, PlayerState
+from src.services.track import Track
+
+class FakeSource:
+    def __init__(self, url: str):
+        self.url = url
+        self.position = 0.0
+        self.cleaned = False
+
+    def cleanup(self) -> None:
+        self.cleaned = True
+
+class FakeVoiceClient:
+    """Voice client that plays until stopped, then runs the after-callback like discord.py."""
+
+    def __init__(self):
+        self.after = None
+
+    def is_connected(self) -> bool:
+        return True
+
+    def play(self, source, *, after=None) -> None:
+        self.after = after
+
+    def stop(self) -> None:
+        after, self.after = self.after, None
+        if after is not None:
+            after(None)
+
+    def pause(self) -> None:
+        pass
+
+    def resume(self) -> None:
+        pass
+
+    async def disconnect(self, *, force: bool = False) -> None:
+        pass
+
+@pytest.fixture
+def started(monkeypatch):
+    """URLs of the streams the player started, in order."""
+    started = []
+
+    async def resolve_stream(url, audio_format=None, timeout=None):
+        return {'url': url}
+
+    async def create_source(stream, preset, start_offset=0.0):
+        started.append(stream['url'])
+        return FakeSource(stream['url']), 'passthrough', 128
+
+    monkeypatch.setattr(audio_player_module.youtube_service, 'resolve_stream', resolve_stream)
+    monkeypatch.setattr(audio_player_module.playback_engine, 'create_source', create_source)
+    return started
+
+def make_player(*video_ids, duration=None) -> AudioPlayer:
+    player = AudioPlayer(guild_id=1)
+    player.voice_client = FakeVoiceClient()
+    for video_id in video_ids:
+        player.add_track(Track(title=video_id, video_id=video_id, duration=duration))
+    return player
+
+async def settle() -> None:
+    # Let track-end events hop through the loop and the inbox
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+def test_queue_edits_through_the_inbox(started):
+    async def scenario():
+        player = make_player('a', 'b', 'c', 'd')
+        assert (await player.remove(1)).video_id == 'b'
+        assert (await player.move(2, 0)).video_id == 'd'
+        await player.enqueue(Track(title='e', video_id='e'))
+        assert [track.video_id for track in player.queue] == ['d', 'a', 'c', 'e']
+        assert await player.remove(9) is None
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_rapid_skips_are_coalesced(started):
+    async def scenario():
+        player = make_player('a', 'b', 'c', 'd', 'e')
+        assert await player.play()
+        assert player.current_track.video_id == 'a'
+
+        # Posted before the player task runs, so they arrive as one batch
+        results = await asyncio.gather(player.skip(), player.skip(), player.skip())
+        await settle()
+
+        assert [track.video_id for track in results] == ['d', 'd', 'd']
+        assert player.current_track.video_id == 'd'
+        assert player.state is PlayerState.PLAYING
+        # b and c were dropped without ever being started
+        assert [url.rsplit('=', 1)[-1] for url in started] == ['a', 'd']
+        assert [track.video_id for track in player.queue] == ['e']
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_skip_past_the_end_goes_idle(started):
+    async def scenario():
+        player = make_player('a', 'b')
+        await player.play()
+        results = await asyncio.gather(player.skip(), player.skip(), player.skip())
+        await settle()
+
+        assert results == [None, None, None]
+        assert player.state is PlayerState.IDLE
+        assert player.current_track is None
+        assert not player.queue
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_skip_when_idle_does_nothing(started):
+    async def scenario():
+        player = make_player('a')
+        assert await player.skip() is None
+        assert [track.video_id for track in player.queue] == ['a']
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_stop_is_serialized_with_skips(started):
+    async def scenario():
+        player = make_player('a', 'b', 'c')
+        await player.play()
+        # The stop is applied after the skip, not in the middle of it
+        skipped, _ = await asyncio.gather(player.skip(), player.stop())
+        await settle()
+
+        assert skipped.video_id == 'b'
+        assert player.state is PlayerState.IDLE
+        assert player.current_track is None
+        assert not player.queue
+        assert [url.rsplit('=', 1)[-1] for url in started] == ['a']
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_voice_disconnect_does_not_restart(started):
+    async def scenario():
+        player = make_player('a', 'b', duration=300)
+        await player.play()
+
+        # Voice dropped mid-track: the stream ends early but must not be restarted
+        player.voice_client.is_connected = lambda: False
+        player.voice_client.stop()
+        await settle()
+
+        assert [url.rsplit('=', 1)[-1] for url in started] == ['a']
+        assert player.state is PlayerState.IDLE
+        assert [track.video_id for track in player.queue] == ['b']
+        await player.close()
+
+    asyncio.run(scenario())
+
+def test_reaper_evicts_queued_players_after_the_queue_timeout(started):
+    async def scenario():
+        manager = audio_player_module.AudioManager(idle_timeout=60, queue_timeout=600)
+        empty = manager.get_player(1)
+        queued = manager.get_player(2)
+        queued.voice_client = FakeVoiceClient()
+        queued.add_track(Track(title='a', video_id='a'))
+
+        empty.idle_since = queued.idle_since = time.monotonic() - 120
+        assert await manager.reap_idle() == 1
+        assert list(manager.players) == [2]
+        assert queued.voice_client is None
+
+        queued.idle_since = time.monotonic() - 900
+        assert await manager.reap_idle() == 1
+        assert not manager.players
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the slash command hash that lets startup skip unchanged syncs.
+"""
+import asyncio
+import os
+
+import pytest
+
+discord = pytest.importorskip('discord')
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from discord import app_commands
+
+from src import bot as bot_module
+from src.bot import command_tree_hash, sync_command_tree
+
+def make_tree(*commands):
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+    for name, description in commands:
+        async def callback(interaction: discord.Interaction, query: str):
+            pass
+        tree.add_command(app_commands.Command(name=name, description=description, callback=callback))
+    return tree
+
+def test_hash_is_stable_across_registration_order():
+    first = make_tree(('play', 'Play a song'), ('skip', 'Skip the current song'))
+    second = make_tree(('skip', 'Skip the current song'), ('play', 'Play a song'))
+    assert command_tree_hash(first) == command_tree_hash(second)
+    assert command_tree_hash(first) == command_tree_hash(first)
+
+def test_hash_changes_with_the_definitions():
+    base = command_tree_hash(make_tree(('play', 'Play a song')))
+    assert command_tree_hash(make_tree(('play', 'Play a track'))) != base
+    assert command_tree_hash(make_tree(('play', 'Play a song'), ('stop', 'Stop'))) != base
+
+def test_sync_is_skipped_while_the_hash_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot_module.Config, 'COMMAND_HASH_PATH', str(tmp_path / 'data' / 'commands.sha256'))
+    tree = make_tree(('play', 'Play a song'))
+    synced = []
+
+    async def sync():
+        synced.append(True)
+        return tree.get_commands()
+
+    tree.sync = sync
+    asyncio.run(sync_command_tree(tree, 1234))
+    asyncio.run(sync_command_tree(tree, 1234))
+    assert len(synced) == 1
+    # Another application with the same commands still syncs
+    asyncio.run(sync_command_tree(tree, 5678))
+    assert len(synced) == 2
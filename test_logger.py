@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the logging pipeline's rate limiting and non-blocking queue handler.
+"""
+import json
+import logging
+import os
+import queue
+import sys
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src import logger as logger_module
+from src.logger import DroppingQueueHandler, JsonFormatter, RateLimitFilter, parse_rate_limits
+
+def make_record(name='src.services.youtube_service', level=logging.DEBUG, msg='lookup %s', args=('x',)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(logger_module.time, 'monotonic', lambda: clock[0])
+    return clock
+
+def test_rate_limit_drops_and_reports_sampled_out(clock):
+    rate_filter = RateLimitFilter({'src.services': 1.0}, burst_seconds=2.0)
+    passed = [rate_filter.filter(make_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    clock[0] += 1.0
+    record = make_record()
+    assert rate_filter.filter(record)
+    assert record.sampled_out == 3
+
+def test_rate_limit_leaves_warnings_and_other_loggers_alone(clock):
+    rate_filter = RateLimitFilter({'src.services': 1.0}, burst_seconds=1.0)
+    assert rate_filter.filter(make_record())
+    assert rate_filter.filter(make_record(level=logging.WARNING))
+    assert rate_filter.filter(make_record(name='src.commands.play'))
+    assert rate_filter.filter(make_record(name='src.servicesx'))
+    assert not rate_filter.filter(make_record(name='src.services.audio_player'))
+
+def test_longest_prefix_wins(clock):
+    rate_filter = RateLimitFilter({'src': 100.0, 'src.services.playback': 0.5}, burst_seconds=2.0)
+    assert rate_filter.filter(make_record(name='src.services.playback'))
+    assert not rate_filter.filter(make_record(name='src.services.playback'))
+    assert rate_filter.filter(make_record(name='src.services.youtube_service'))
+
+def test_parse_rate_limits():
+    assert parse_rate_limits('src.services=5, discord.gateway = 0.5,,bad') == {
+        'src.services': 5.0, 'discord.gateway': 0.5
+    }
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(make_record(level=logging.INFO))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+def test_queue_handler_merges_args_and_formats_exceptions():
+    handler = DroppingQueueHandler(queue.Queue())
+    args = ['first']
+    try:
+        raise RuntimeError('boom')
+    except RuntimeError:
+        record = make_record(level=logging.ERROR, msg='failed %s', args=(args,))
+        record.exc_info = sys.exc_info()
+    handler.handle(record)
+    args.append('changed later')
+
+    queued = handler.queue.get_nowait()
+    assert queued.getMessage() == "failed ['first']"
+    assert queued.exc_info is None
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry['message'] == "failed ['first']"
+    assert 'RuntimeError: boom' in entry['exception']
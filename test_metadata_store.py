@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite metadata store: write batching and reopening.
+"""
+import sqlite3
+
+from src.services.metadata_store import MetadataStore
+
+def video(video_id, title='Song'):
+    return {'id': video_id, 'title': title, 'url': f'https://www.youtube.com/watch?v={video_id}',
+            'duration': 200, 'thumbnail': '', 'uploader': 'Artist'}
+
+def stored_videos(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
+
+def test_writes_are_buffered_until_the_batch_fills(tmp_path):
+    path = str(tmp_path / 'metadata.db')
+    store = MetadataStore(path, batch_size=4, flush_interval=3600)
+    store.open()
+    store.put('song one', video('aaaaaaaaaaa'))
+    # Buffered, but already visible to lookups
+    assert stored_videos(path) == 0
+    assert store.get_query('song one')['id'] == 'aaaaaaaaaaa'
+
+    # Two videos and two queries fill the batch of four
+    store.put('song two', video('bbbbbbbbbbb'))
+    assert stored_videos(path) == 2
+    store.close()
+
+def test_records_survive_a_reopen(tmp_path):
+    path = str(tmp_path / 'data' / 'metadata.db')
+    store = MetadataStore(path, batch_size=100, flush_interval=3600)
+    store.open()
+    store.put('never gonna give you up', video('dQw4w9WgXcQ', 'Never Gonna Give You Up'))
+    store.put(None, video('bbbbbbbbbbb'))
+    store.close()
+
+    reopened = MetadataStore(path)
+    reopened.open()
+    assert reopened.get_query('never gonna give you up')['title'] == 'Never Gonna Give You Up'
+    assert reopened.get_video('bbbbbbbbbbb')['duration'] == 200
+    assert reopened.get_video('missing0000') is None
+    assert reopened.get_query('unknown query') is None
+    reopened.close()
+
+def test_entries_without_an_id_are_ignored(tmp_path):
+    store = MetadataStore(str(tmp_path / 'metadata.db'), batch_size=1)
+    store.open()
+    store.put('query', {'title': 'No id'})
+    assert store.get_query('query') is None
+    store.close()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the metrics registry and its text exposition output.
+"""
+import pytest
+
+from src.services.metrics import MetricsRegistry
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    tracks = registry.counter('tracks_total', 'Tracks started', ('path',))
+    registry.gauge('players', 'Players in memory', collect=lambda: 3)
+    tracks.inc(path='passthrough')
+    tracks.inc(2, path='transcode')
+
+    assert registry.render() == (
+        '# HELP tracks_total Tracks started\n'
+        '# TYPE tracks_total counter\n'
+        'tracks_total{path="passthrough"} 1\n'
+        'tracks_total{path="transcode"} 2\n'
+        '# HELP players Players in memory\n'
+        '# TYPE players gauge\n'
+        'players 3\n'
+    )
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, stage='resolve')
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="resolve",le="0.1"} 1',
+        'latency_seconds_bucket{stage="resolve",le="1"} 3',
+        'latency_seconds_bucket{stage="resolve",le="+Inf"} 4',
+        'latency_seconds_sum{stage="resolve"} 4.05',
+        'latency_seconds_count{stage="resolve"} 4',
+    ]
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.gauge('queue_length', 'Queue', ('guild',), collect=lambda: {('a"b\\c',): 2})
+    assert 'queue_length{guild="a\\"b\\\\c"} 2' in registry.render()
+
+def test_collect_errors_skip_only_that_family():
+    registry = MetricsRegistry()
+    registry.gauge('broken', 'Fails to collect', collect=lambda: 1 / 0)
+    registry.counter('ok_total', 'Still rendered').inc()
+    assert registry.render().splitlines() == [
+        '# HELP ok_total Still rendered', '# TYPE ok_total counter', 'ok_total 1'
+    ]
+
+def test_wrong_labels_and_duplicate_names_are_rejected():
+    registry = MetricsRegistry()
+    counter = registry.counter('events_total', 'Events', ('kind',))
+    with pytest.raises(ValueError):
+        counter.inc(stage='x')
+    with pytest.raises(ValueError):
+        registry.counter('events_total', 'Again')
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Unit tests for playlist links and streaming playlist entries in batches.
+"""
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services.youtube_service import YouTubeService
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.youtube.com/playlist?list=PL0123456789', True),
+    ('https://www.youtube.com/watch?list=PL0123456789', True),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ', False),
+    ('https://youtu.be/dQw4w9WgXcQ?list=PL0123456789', False),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ', False),
+    ('lofi hip hop', False),
+])
+def test_is_playlist_url(url, expected):
+    assert YouTubeService().is_playlist_url(url) is expected
+
+def entries(count):
+    return [{'id': f'{i:011d}', 'title': f'Track {i}'} for i in range(count)]
+
+def collect(service, url, **kwargs):
+    async def scenario():
+        return [batch async for batch in service.stream_playlist(url, **kwargs)]
+    return asyncio.run(scenario())
+
+def test_stream_playlist_yields_every_entry_in_order():
+    service = YouTubeService()
+    service.iter_playlist = lambda url: iter(entries(120))
+    batches = collect(service, 'https://www.youtube.com/playlist?list=PL0123456789')
+    assert all(batches)
+    assert [entry['id'] for batch in batches for entry in batch] == [f'{i:011d}' for i in range(120)]
+    service.shutdown()
+
+def test_stream_playlist_stops_at_the_limit():
+    service = YouTubeService()
+    service.iter_playlist = lambda url: iter(entries(50))
+    batches = collect(service, 'https://www.youtube.com/playlist?list=PL0123456789', limit=10)
+    assert sum(len(batch) for batch in batches) == 10
+    service.shutdown()
+
+def test_stream_playlist_ends_on_extractor_errors():
+    service = YouTubeService()
+
+    def iter_playlist(url):
+        yield from entries(3)
+        raise Exception('This playlist is private')
+
+    service.iter_playlist = iter_playlist
+    batches = collect(service, 'https://www.youtube.com/playlist?list=PL0123456789')
+    assert sum(len(batch) for batch in batches) == 3
+    service.shutdown()
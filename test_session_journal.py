@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the session journal: snapshots, reading them back and compaction.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services import session_journal as journal_module
+from src.services.session_journal import SessionJournal, session_journal_path
+from src.services.track import Track
+from src.services.track_queue import TrackQueue
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+class FakeVoiceClient:
+    def __init__(self, channel_id):
+        self.channel = FakeChannel(channel_id)
+
+    def is_connected(self):
+        return True
+
+class FakePlayer:
+    def __init__(self, *video_ids, current=None, channel_id=None):
+        self.queue = TrackQueue()
+        for video_id in video_ids:
+            self.queue.append(Track(title=f'Track {video_id}', video_id=video_id, duration=200, requester_id=7))
+        self.current_track = Track(title=f'Track {current}', video_id=current, duration=200) if current else None
+        self.voice_client = FakeVoiceClient(channel_id) if channel_id else None
+        self.position = 0.0
+
+class FakeManager:
+    def __init__(self):
+        self.players = {}
+        self.guild_presets = {}
+
+def snapshot(journal, manager, compact=False):
+    return asyncio.run(journal.snapshot(manager, compact=compact))
+
+def records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'data' / 'sessions.jsonl')
+
+def test_sessions_round_trip(path):
+    journal = SessionJournal()
+    journal.open(path)
+    manager = FakeManager()
+    manager.players[1] = FakePlayer('b', 'c', current='a', channel_id=99)
+    manager.players[1].position = 42.04
+    manager.players[2] = FakePlayer('d')
+    manager.guild_presets[3] = 'low'
+    assert snapshot(journal, manager, compact=True) == 3
+
+    reopened = SessionJournal()
+    reopened.open(path)
+    session = reopened.saved[1]
+    assert session['c'] == 99
+    assert session['n'] == ['Track a', 'a', 200, None]
+    assert [fields[1] for fields in session['q']] == ['b', 'c']
+    assert session['q'][0][3] == 7
+    assert session['p'] == 42.0
+    assert reopened.saved[2]['c'] is None
+    assert reopened.saved[3] == {'c': None, 'n': None, 'q': [], 'p': 0.0, 'a': 'low'}
+
+def test_only_changes_are_appended(path):
+    journal = SessionJournal()
+    journal.open(path)
+    manager = FakeManager()
+    player = manager.players[1] = FakePlayer('b', current='a', channel_id=99)
+    snapshot(journal, manager, compact=True)
+
+    # Nothing changed
+    assert snapshot(journal, manager) == 0
+    # Only the position moved
+    player.position = 10.0
+    assert snapshot(journal, manager) == 1
+    assert records(path)[-1] == {'g': 1, 'p': 10.0}
+    # The queue changed, so the whole session is written again
+    player.queue.popleft()
+    assert snapshot(journal, manager) == 1
+    assert records(path)[-1]['q'] == []
+    # The session ended
+    del manager.players[1]
+    assert snapshot(journal, manager) == 1
+    assert records(path)[-1] == {'g': 1, 'x': 1}
+
+    reopened = SessionJournal()
+    reopened.open(path)
+    assert reopened.saved == {}
+
+def test_last_record_wins_and_torn_lines_are_skipped(path):
+    journal = SessionJournal()
+    journal.open(path)
+    manager = FakeManager()
+    player = manager.players[1] = FakePlayer(current='a', channel_id=99)
+    snapshot(journal, manager, compact=True)
+    player.position = 30.0
+    snapshot(journal, manager)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"g": 1, "p": 9')
+
+    reopened = SessionJournal()
+    reopened.open(path)
+    assert reopened.saved[1]['p'] == 30.0
+    assert reopened.saved[1]['n'][1] == 'a'
+
+def test_journal_is_compacted_once_it_grows(path, monkeypatch):
+    monkeypatch.setattr(journal_module, 'COMPACT_FACTOR', 2)
+    monkeypatch.setattr(journal_module, 'COMPACT_MIN_RECORDS', 5)
+    journal = SessionJournal()
+    journal.open(path)
+    manager = FakeManager()
+    player = manager.players[1] = FakePlayer(current='a', channel_id=99)
+    snapshot(journal, manager, compact=True)
+
+    for second in range(1, 10):
+        player.position = float(second)
+        snapshot(journal, manager)
+    # Once over 1 * 2 + 5 records, the next snapshot rewrote the file with one record
+    assert len(records(path)) == 2
+    assert journal.get_stats()['records'] == len(records(path))
+
+    reopened = SessionJournal()
+    reopened.open(path)
+    assert reopened.saved[1]['p'] == 9.0
+
+def test_session_journal_path_per_worker():
+    assert session_journal_path('data/sessions.jsonl') == 'data/sessions.jsonl'
+    assert session_journal_path('data/sessions.jsonl', 2) == 'data/sessions-2.jsonl'
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Unit tests for splitting shards across worker processes.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.sharding import assign_shards
+
+@pytest.mark.parametrize('shard_count, processes, expected', [
+    (4, 2, [[0, 1], [2, 3]]),
+    (5, 2, [[0, 1, 2], [3, 4]]),
+    (7, 3, [[0, 1, 2], [3, 4], [5, 6]]),
+    (1, 1, [[0]]),
+    (2, 4, [[0], [1]]),
+    (3, 0, [[0, 1, 2]]),
+])
+def test_assign_shards(shard_count, processes, expected):
+    assert assign_shards(shard_count, processes) == expected
+
+@pytest.mark.parametrize('shard_count, processes', [(16, 3), (100, 7), (64, 64), (10, 1)])
+def test_every_shard_is_assigned_once_in_order(shard_count, processes):
+    ranges = assign_shards(shard_count, processes)
+    assert [shard for shard_ids in ranges for shard in shard_ids] == list(range(shard_count))
+    sizes = [len(shard_ids) for shard_ids in ranges]
+    assert max(sizes) - min(sizes) <= 1
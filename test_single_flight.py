@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for coalescing concurrent identical lookups into one extraction.
+"""
+import asyncio
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services.youtube_service import YouTubeService
+
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+@pytest.fixture
+def service():
+    service = YouTubeService()
+    service.calls = []
+    service.release = threading.Event()
+
+    def get_stream_info(video_url, audio_format=None):
+        service.calls.append((video_url, audio_format))
+        service.release.wait(5)
+        return {'url': f'{video_url}&format={audio_format}', 'acodec': 'opus', 'abr': 160}
+
+    service.get_stream_info = get_stream_info
+    yield service
+    service.release.set()
+    service.shutdown()
+
+def test_concurrent_resolves_share_one_extraction(service):
+    async def scenario():
+        tasks = [asyncio.ensure_future(service.resolve_stream(URL)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        service.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert len(service.calls) == 1
+    assert (service.flights, service.coalesced) == (1, 4)
+    assert all(result == results[0] for result in results)
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 5
+    assert not service._inflight
+
+def test_different_formats_are_not_coalesced(service):
+    async def scenario():
+        tasks = [asyncio.ensure_future(service.resolve_stream(URL, audio_format)) for audio_format in ('a', 'b')]
+        await asyncio.sleep(0.05)
+        service.release.set()
+        return await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert sorted(service.calls) == [(URL, 'a'), (URL, 'b')]
+
+def test_cancelled_caller_does_not_cancel_the_others(service):
+    async def scenario():
+        dropped = asyncio.ensure_future(service.resolve_stream(URL))
+        waiting = asyncio.ensure_future(service.resolve_stream(URL))
+        await asyncio.sleep(0.05)
+        dropped.cancel()
+        await asyncio.sleep(0)
+        service.release.set()
+        return await waiting
+
+    assert asyncio.run(scenario())['acodec'] == 'opus'
+    assert len(service.calls) == 1
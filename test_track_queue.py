@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the deque-backed TrackQueue.
+"""
+from src.services.track import Track
+from src.services.track_queue import TrackQueue
+
+def make_queue(*video_ids, duration=60):
+    queue = TrackQueue()
+    for video_id in video_ids:
+        queue.append(Track(title=f'Track {video_id}', video_id=video_id, duration=duration))
+    return queue
+
+def ids(queue):
+    return [track.video_id for track in queue]
+
+def test_popleft_in_order_and_empty():
+    queue = make_queue('a', 'b')
+    assert queue.popleft().video_id == 'a'
+    assert queue.popleft().video_id == 'b'
+    assert queue.popleft() is None
+    assert not queue
+
+def test_remove_at():
+    queue = make_queue('a', 'b', 'c', 'd')
+    assert queue.remove_at(2).video_id == 'c'
+    assert queue.remove_at(0).video_id == 'a'
+    assert ids(queue) == ['b', 'd']
+    assert queue.remove_at(2) is None
+    assert queue.remove_at(-1) is None
+    assert len(queue) == 2
+
+def test_move():
+    queue = make_queue('a', 'b', 'c', 'd')
+    assert queue.move(0, 3).video_id == 'a'
+    assert ids(queue) == ['b', 'c', 'd', 'a']
+    assert queue.move(3, 1).video_id == 'a'
+    assert ids(queue) == ['b', 'a', 'c', 'd']
+    assert queue.move(0, 4) is None
+    assert ids(queue) == ['b', 'a', 'c', 'd']
+
+def test_duplicate_counts():
+    queue = make_queue('a', 'b', 'a')
+    duplicate = Track(title='Again', video_id='a')
+    assert queue.contains(duplicate)
+    queue.remove_at(0)
+    # One copy of 'a' is still queued
+    assert queue.contains(duplicate)
+    queue.remove_at(1)
+    assert not queue.contains(duplicate)
+    queue.move(0, 0)
+    assert queue.contains(Track(title='B', video_id='b'))
+    queue.clear()
+    assert not queue.contains(Track(title='B', video_id='b'))
+
+def test_version_changes_on_every_mutation():
+    queue = TrackQueue()
+    versions = [queue.version]
+    queue.append(Track(title='A', video_id='a'))
+    versions.append(queue.version)
+    queue.appendleft(Track(title='B', video_id='b'))
+    versions.append(queue.version)
+    queue.move(0, 1)
+    versions.append(queue.version)
+    queue.remove_at(1)
+    versions.append(queue.version)
+    queue.popleft()
+    versions.append(queue.version)
+    queue.clear()
+    versions.append(queue.version)
+    assert versions == sorted(set(versions))
+
+def test_version_unchanged_by_failed_operations():
+    queue = make_queue('a')
+    version = queue.version
+    assert queue.remove_at(5) is None
+    assert queue.move(0, 5) is None
+    queue.page(0, 10)
+    assert queue.version == version
+
+def test_duration_totals():
+    queue = make_queue('a', 'b', duration=100)
+    queue.append(Track(title='Live', video_id='c', duration=None))
+    assert queue.total_duration == 200
+    assert queue.unknown_durations == 1
+    queue.remove_at(2)
+    assert queue.unknown_durations == 0
+    queue.popleft()
+    assert queue.total_duration == 100
+    queue.move(0, 0)
+    assert queue.total_duration == 100
+    queue.clear()
+    assert (queue.total_duration, queue.unknown_durations) == (0, 0)
+
+def test_page():
+    queue = make_queue(*(f'{i:03d}' for i in range(25)))
+    assert ids(queue.page(0, 10)) == [f'{i:03d}' for i in range(10)]
+    assert ids(queue.page(20, 10)) == [f'{i:03d}' for i in range(20, 25)]
+    assert queue.page(25, 10) == []
+    assert len(queue) == 25
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the TTL + LRU cache behind the search and stream caches.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services import youtube_service as youtube_module
+from src.services.youtube_service import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(youtube_module.time, 'time', clock)
+    return clock
+
+def test_ttl_cache_expiry(clock):
+    cache = TTLCache('test', max_entries=10, max_bytes=1 << 20, default_ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=5)
+    clock.now += 10
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    clock.now += 60
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0
+
+def test_ttl_cache_ignores_non_positive_ttl(clock):
+    cache = TTLCache('test', max_entries=10, max_bytes=1 << 20, default_ttl=60)
+    cache.set('a', 1, ttl=0)
+    assert cache.get('a') is None
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache('test', max_entries=2, max_bytes=1 << 20, default_ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.evictions == 1
+
+def test_ttl_cache_byte_cap(clock):
+    cache = TTLCache('test', max_entries=100, max_bytes=2000, default_ttl=60)
+    for i in range(20):
+        cache.set(f'key{i}', 'x' * 200)
+    stats = cache.stats()
+    assert stats['bytes'] <= 2000
+    assert 0 < stats['entries'] < 20
+    assert cache.get('key19') is not None
+
+def test_ttl_cache_counters(clock):
+    cache = TTLCache('test', max_entries=10, max_bytes=1 << 20, default_ttl=60)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert (cache.hits, cache.misses) == (1, 1)
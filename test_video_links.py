@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the direct video link fast path: id parsing and the search fallback.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('dotenv')
+os.environ.setdefault('DISCORD_TOKEN', 'test')
+
+from src.services.youtube_service import YouTubeService, parse_video_id
+
+@pytest.mark.parametrize('query, expected', [
+    ('dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('  dQw4w9WgXcQ  ', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('youtube.com/watch?v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://m.youtube.com/watch?v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://music.youtube.com/watch?v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://youtu.be/dQw4w9WgXcQ?t=42', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/shorts/dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/embed/dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://www.youtube.com/live/dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('never gonna give you up', None),
+    ('https://www.youtube.com/playlist?list=PL0123456789', None),
+    ('https://www.youtube.com/watch?v=short', None),
+    ('https://example.com/watch?v=dQw4w9WgXcQ', None),
+])
+def test_parse_video_id(query, expected):
+    assert parse_video_id(query) == expected
+
+def test_word_shaped_like_an_id_falls_back_to_search():
+    service = YouTubeService()
+    calls = []
+
+    def extract(kind, *args):
+        calls.append(kind)
+        if kind == 'video':
+            raise Exception('Video unavailable')
+        return {'id': 'abcdefghijk', 'title': 'Unstoppable', 'duration': 217}
+
+    service._extract = extract
+    assert service.search_video('Unstoppable')['title'] == 'Unstoppable'
+    assert calls == ['video', 'search']
+    # Served from the search cache without another id guess
+    assert service.search_video('unstoppable')['title'] == 'Unstoppable'
+    assert calls == ['video', 'search']
+    # The failed id guess is remembered even when the search itself is not cached
+    service.search_cache.clear()
+    service.search_video('Unstoppable')
+    assert calls == ['video', 'search', 'search']
+
+def test_video_link_skips_the_search():
+    service = YouTubeService()
+    calls = []
+
+    def extract(kind, *args):
+        calls.append((kind, args[0]))
+        # Video extraction also returns the stream it resolved on the way
+        return {'id': 'dQw4w9WgXcQ', 'title': 'Never Gonna Give You Up', 'duration': 213}, None
+
+    service._extract = extract
+    result = service.search_video('https://youtu.be/dQw4w9WgXcQ?t=42')
+    assert result['id'] == 'dQw4w9WgXcQ'
+    assert calls == [('video', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')]